@@ -12,7 +12,6 @@ from sklearn.pipeline import Pipeline
 from sklearn.metrics import f1_score, accuracy_score
 from typing import Dict, Any
 import logging  # (🔥 신규)
-import traceback # (🔥 신규)
 
 # (🔥 신규) main.py에서 설정한 로거를 가져옴
 logger = logging.getLogger(__name__)
@@ -155,9 +154,8 @@ def run_analysis(df: pd.DataFrame, cfg: DictConfig) -> Dict[str, Any]:
 
     except Exception as e:
         # (🔥 수정) print -> logger.error
-        logger.error(f"[ERROR M7] KPI 분석 중 심각한 오류 발생: {e}")
-        # (🔥 수정) traceback.print_exc() -> logger.error()
-        logger.error(traceback.format_exc())
+        # 메시지와 traceback을 한 레코드로 기록 (exc_info: 핸들러가 출력할 때만 렌더링)
+        logger.error("[ERROR M7] KPI 분석 중 심각한 오류 발생: %s", e, exc_info=True)
         metrics['analysis_status'] = "failed"
         
     return metrics
\ No newline at end of file
@@ -5,6 +5,7 @@ Clean Epochs로부터 모든 KPI(Band Power, Asymmetry, Connectivity 등)를 추
 
 주요 기능:
 - Band Powers: Delta, Theta, Alpha, Beta, Gamma (Welch's method)
+- Spectra: STFT 1회로 Welch PSD + CSD를 함께 계산 (Band Power와 Coherence가 공유)
 - Basic Stats: Mean, Std, Skewness, Kurtosis
 - Cross-Channel: Asymmetry, Coherence
 - Optional: TBR, Engagement 등
@@ -13,7 +14,7 @@ Clean Epochs로부터 모든 KPI(Band Power, Asymmetry, Connectivity 등)를 추
 """
 
 import logging
-from typing import Dict, Optional
+from typing import Dict, Optional, Tuple
 
 import mne
 import numpy as np
@@ -44,11 +45,17 @@ def extract_features(
     try:
         logger.info(f"Feature Extraction 시작: {len(epochs)}개 Epoch")
 
+        # Epoch 길이와 샘플링 레이트가 고정이므로 주파수 축과
+        # 대역별 인덱스 구간은 Epoch 루프 밖에서 한 번만 계산
+        sfreq = cfg.PREPROCESSING.sampling_rate
+        freqs = np.fft.rfftfreq(_get_nperseg(len(epochs.times)), 1.0 / sfreq)
+        band_slices = _compute_band_slices(freqs, cfg.BANDS)
+
         # Epoch별 KPI 수집
         epoch_features = []
         for epoch_idx in range(len(epochs)):
             epoch_data = epochs[epoch_idx].get_data()[0]  # (n_channels, n_times)
-            features = _extract_epoch_features(epoch_data, cfg)
+            features = _extract_epoch_features(epoch_data, cfg, band_slices)
             epoch_features.append(features)
 
         # Epoch별 평균 계산
@@ -63,7 +70,9 @@ def extract_features(
 
 
 def _extract_epoch_features(
-    epoch_data: np.ndarray, cfg: DictConfig
+    epoch_data: np.ndarray,
+    cfg: DictConfig,
+    band_slices: Dict[str, Tuple[int, int]],
 ) -> Dict[str, float]:
     """
     단일 Epoch에서 모든 KPI 추출.
@@ -74,6 +83,8 @@ def _extract_epoch_features(
         (n_channels, n_times) 형태의 Epoch 데이터.
     cfg : DictConfig
         분석 설정.
+    band_slices : dict
+        {band_name: (i_lo, i_hi)} 대역별 주파수 인덱스 구간 (_compute_band_slices 결과).
 
     Returns
     -------
@@ -85,9 +96,18 @@ def _extract_epoch_features(
     ch1_data = epoch_data[0, :]
     ch2_data = epoch_data[1, :]
 
+    # 0. Spectra (STFT 1회 → 채널별 Welch PSD + 교차 스펙트럼)
+    try:
+        freqs, psd, csd = _compute_spectra(epoch_data, sfreq)
+        psd_ch1, psd_ch2 = psd[0], psd[1]
+    except Exception as e:
+        logger.warning(f"Spectrum 계산 실패: {e}")
+        # 아래 Band Power / Coherence 함수가 각각 NaN 처리
+        freqs, psd_ch1, psd_ch2, csd = None, None, None, None
+
     # 1. Band Powers (Welch's method)
-    band_powers_ch1 = _compute_band_powers(ch1_data, sfreq, cfg.BANDS)
-    band_powers_ch2 = _compute_band_powers(ch2_data, sfreq, cfg.BANDS)
+    band_powers_ch1 = _compute_band_powers(psd_ch1, freqs, band_slices)
+    band_powers_ch2 = _compute_band_powers(psd_ch2, freqs, band_slices)
 
     for band_name, power in band_powers_ch1.items():
         features[f"Ch1_Band_{band_name}"] = power
@@ -110,7 +130,7 @@ def _extract_epoch_features(
     features["Asym_Band_Alpha"] = _compute_asymmetry(alpha_ch1, alpha_ch2)
 
     # Coherence
-    coherence_vals = _compute_coherence(ch1_data, ch2_data, sfreq, cfg.BANDS)
+    coherence_vals = _compute_coherence(psd_ch1, psd_ch2, csd, band_slices)
     for band_name, coh in coherence_vals.items():
         features[f"Conn_Coh_{band_name}"] = coh
 
@@ -136,21 +156,102 @@ def _extract_epoch_features(
     return features
 
 
-def _compute_band_powers(
-    data: np.ndarray, sfreq: float, bands: DictConfig
-) -> Dict[str, float]:
+def _get_nperseg(n_times: int) -> int:
+    """Welch/STFT 세그먼트 길이 (256 샘플, Epoch가 더 짧으면 Epoch 길이)."""
+    return min(256, n_times)
+
+
+def _compute_band_slices(
+    freqs: np.ndarray, bands: DictConfig
+) -> Dict[str, Tuple[int, int]]:
     """
-    Welch's method로 Band Power 계산.
+    대역별 주파수 인덱스 구간 계산.
+
+    freqs는 오름차순 균일 간격이므로 불리언 마스크 대신
+    psd[i_lo:i_hi] 슬라이스로 같은 빈(low <= f <= high)을 가리킵니다.
 
     Parameters
     ----------
-    data : np.ndarray
-        (n_times,) 형태의 채널 데이터.
-    sfreq : float
-        샘플링 레이트.
+    freqs : np.ndarray
+        주파수 축.
     bands : DictConfig
         주파수 대역 설정.
 
+    Returns
+    -------
+    dict
+        {band_name: (i_lo, i_hi)} 딕셔너리 (i_hi는 exclusive, i_lo == i_hi이면 빈 대역).
+    """
+    lows = [band_range[0] for band_range in bands.values()]
+    highs = [band_range[1] for band_range in bands.values()]
+    i_lo = np.searchsorted(freqs, lows, side="left")
+    i_hi = np.searchsorted(freqs, highs, side="right")
+    return {
+        band_name: (int(lo), int(hi))
+        for band_name, lo, hi in zip(bands.keys(), i_lo, i_hi)
+    }
+
+
+def _compute_spectra(epoch_data: np.ndarray, sfreq: float):
+    """
+    STFT 한 번으로 모든 채널의 Welch PSD와 Ch1-Ch2 교차 스펙트럼(CSD)을 계산.
+
+    signal.welch와 signal.coherence를 따로 호출하면 같은 윈도우 FFT를 두 번 수행하므로,
+    Welch와 동일한 설정(Hann, 50% overlap, constant detrend)의 STFT를 한 번만 구하고
+    시간 축 평균으로 PSD/CSD를 얻습니다. 결과는 welch / coherence와 수치적으로 동일합니다.
+
+    Parameters
+    ----------
+    epoch_data : np.ndarray
+        (n_channels, n_times) 형태의 Epoch 데이터.
+    sfreq : float
+        샘플링 레이트.
+
+    Returns
+    -------
+    tuple
+        (freqs, psd, csd) - psd는 (n_channels, n_freqs), csd는 (n_freqs,) 복소 배열.
+    """
+    nperseg = _get_nperseg(epoch_data.shape[-1])
+    freqs, _, zxx = signal.stft(
+        epoch_data,
+        fs=sfreq,
+        nperseg=nperseg,
+        noverlap=nperseg // 2,
+        detrend="constant",
+        return_onesided=True,
+        boundary=None,
+        padded=False,
+        scaling="psd",
+    )
+
+    # |Zxx|^2의 시간 평균 = Welch PSD, Z1·conj(Z2)의 시간 평균 = CSD
+    psd = np.mean(zxx.real ** 2 + zxx.imag ** 2, axis=-1)
+    csd = np.mean(zxx[0] * np.conj(zxx[1]), axis=-1)
+
+    # 단측 스펙트럼 보정 (DC와 Nyquist 빈 제외 2배, welch와 동일)
+    stop = -1 if nperseg % 2 == 0 else None
+    psd[..., 1:stop] *= 2
+    csd[1:stop] *= 2
+
+    return freqs, psd, csd
+
+
+def _compute_band_powers(
+    psd: np.ndarray, freqs: np.ndarray, band_slices: Dict[str, Tuple[int, int]]
+) -> Dict[str, float]:
+    """
+    Welch PSD로부터 Band Power 계산.
+
+    Parameters
+    ----------
+    psd : np.ndarray
+        (n_freqs,) 형태의 채널 PSD (_compute_spectra 결과).
+    freqs : np.ndarray
+        주파수 축.
+    band_slices : dict
+        {band_name: (i_lo, i_hi)} 대역별 주파수 인덱스 구간.
+
     Returns
     -------
     dict
@@ -158,17 +259,14 @@ def _compute_band_powers(
     """
     powers = {}
     try:
-        freqs, psd = signal.welch(data, fs=sfreq, nperseg=min(256, len(data)))
+        freq_res = freqs[1] - freqs[0]
 
-        for band_name, band_range in bands.items():
-            low, high = band_range
-            idx = np.logical_and(freqs >= low, freqs <= high)
-            power = np.trapz(psd[idx], freqs[idx])
-            powers[band_name] = power
+        for band_name, (i_lo, i_hi) in band_slices.items():
+            powers[band_name] = np.trapz(psd[i_lo:i_hi], dx=freq_res)
 
     except Exception as e:
         logger.warning(f"Band Power 계산 실패: {e}")
-        for band_name in bands.keys():
+        for band_name in band_slices.keys():
             powers[band_name] = np.nan
 
     return powers
@@ -231,24 +329,24 @@ def _compute_asymmetry(ch1_power: float, ch2_power: float) -> float:
 
 
 def _compute_coherence(
-    ch1_data: np.ndarray,
-    ch2_data: np.ndarray,
-    sfreq: float,
-    bands: DictConfig,
+    psd_ch1: np.ndarray,
+    psd_ch2: np.ndarray,
+    csd: np.ndarray,
+    band_slices: Dict[str, Tuple[int, int]],
 ) -> Dict[str, float]:
     """
-    채널 간 Coherence 계산.
+    채널 간 Coherence 계산: |Pxy|^2 / (Pxx * Pyy).
 
     Parameters
     ----------
-    ch1_data : np.ndarray
-        Ch1 데이터.
-    ch2_data : np.ndarray
-        Ch2 데이터.
-    sfreq : float
-        샘플링 레이트.
-    bands : DictConfig
-        주파수 대역 설정.
+    psd_ch1 : np.ndarray
+        Ch1 PSD.
+    psd_ch2 : np.ndarray
+        Ch2 PSD.
+    csd : np.ndarray
+        Ch1-Ch2 교차 스펙트럼 (복소).
+    band_slices : dict
+        {band_name: (i_lo, i_hi)} 대역별 주파수 인덱스 구간.
 
     Returns
     -------
@@ -257,17 +355,19 @@ def _compute_coherence(
     """
     coherence_dict = {}
     try:
-        freqs, coh = signal.coherence(ch1_data, ch2_data, fs=sfreq, nperseg=min(256, len(ch1_data)))
+        coh = np.abs(csd) ** 2 / (psd_ch1 * psd_ch2)
+
+        # 대역 경계 인덱스 [lo0, hi0, lo1, hi1, ...] → reduceat 1회로 모든 대역 합산
+        edges = np.array(list(band_slices.values())).ravel()
+        counts = edges[1::2] - edges[::2]
+        sums = np.add.reduceat(np.append(coh, 0.0), edges)[::2]
 
-        for band_name, band_range in bands.items():
-            low, high = band_range
-            idx = np.logical_and(freqs >= low, freqs <= high)
-            avg_coh = np.mean(coh[idx]) if np.any(idx) else np.nan
-            coherence_dict[band_name] = avg_coh
+        for band_name, band_sum, count in zip(band_slices.keys(), sums, counts):
+            coherence_dict[band_name] = band_sum / count if count > 0 else np.nan
 
     except Exception as e:
         logger.warning(f"Coherence 계산 실패: {e}")
-        for band_name in bands.keys():
+        for band_name in band_slices.keys():
             coherence_dict[band_name] = np.nan
 
     return coherence_dict
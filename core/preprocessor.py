@@ -10,17 +10,61 @@ MNE Raw 객체에 노이즈 제거 필터를 적용하는 전처리 모듈.
 적용 순서 (Q11 반영):
 1. Notch Filter
 2. Bandpass Filter
+
+preprocess_raw는 MNE FIR 필터(notch_filter, filter)를 사용합니다.
+design_filter_sos는 main.py의 float32 sosfiltfilt 경로가 쓰는 IIR 설계
+(Notch + Butterworth Bandpass SOS 캐스케이드)를 캐시와 함께 제공합니다.
 """
 
+from __future__ import annotations
+
 import logging
-from typing import Optional
+from functools import lru_cache
+from typing import TYPE_CHECKING, Optional
 
-import mne
+import numpy as np
 from omegaconf import DictConfig
+from scipy.signal import butter, iirnotch, tf2sos
+
+# mne는 타입 힌트에만 사용 (필터 설계만 쓰는 main.py가 mne import 비용을 내지 않도록)
+if TYPE_CHECKING:
+    import mne
 
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=8)
+def design_filter_sos(
+    sfreq: float, l_freq: float, h_freq: float, notch_freq: float
+) -> np.ndarray:
+    """
+    Notch + Bandpass 필터를 하나의 SOS 캐스케이드로 설계.
+
+    같은 (sfreq, 대역, notch) 설정은 한 번만 설계하고 캐시를 재사용합니다.
+
+    Parameters
+    ----------
+    sfreq : float
+        샘플링 레이트 (Hz).
+    l_freq : float
+        Bandpass 하한 주파수 (Hz).
+    h_freq : float
+        Bandpass 상한 주파수 (Hz).
+    notch_freq : float
+        Notch 주파수 (Hz).
+
+    Returns
+    -------
+    np.ndarray
+        (n_sections, 6) SOS 계수 (Notch 1단 + 4차 Butterworth Bandpass).
+        캐시와 공유되므로 수정하지 마세요.
+    """
+    b, a = iirnotch(notch_freq, Q=30.0, fs=sfreq)
+    notch_sos = tf2sos(b, a)
+    band_sos = butter(4, [l_freq, h_freq], btype="bandpass", fs=sfreq, output="sos")
+    return np.vstack([notch_sos, band_sos])
+
+
 def preprocess_raw(raw: mne.io.RawArray, cfg: DictConfig) -> Optional[mne.io.RawArray]:
     """
     Raw 객체에 Notch + Bandpass 필터 적용.
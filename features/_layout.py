@@ -0,0 +1,32 @@
+"""
+_layout.py
+==========
+103 KPI 열 배치 (결과 행렬의 열 순서 정의)
+
+주요 기능:
+- KPI_COLUMNS: Ch1(A+B+C 46개) → Ch2(46개) → Cross(D 11개) 순서의 전체 열 이름
+- KPI_INDEX: 열 이름 → 열 인덱스
+
+열 이름은 각 features 모듈의 KPI 키 목록에서 한 번만 생성하므로,
+배치 결과를 미리 할당한 (n_epochs, n_kpis) 배열에 인덱스로 바로 기록할 수 있습니다.
+"""
+
+from .features_A import _TIME_KPI_KEYS
+from .features_B import _FREQ_KPI_KEYS
+from .features_C import _NONLINEAR_KPI_KEYS
+from .features_D import _CROSS_KPI_KEYS
+
+# 채널별 KPI 키 (A + B + C, 채널마다 46개)
+CHANNEL_KPI_KEYS = (*_TIME_KPI_KEYS, *_FREQ_KPI_KEYS, *_NONLINEAR_KPI_KEYS)
+
+# 채널 간 KPI 키 (D, 11개)
+CROSS_KPI_KEYS = tuple(_CROSS_KPI_KEYS)
+
+CHANNEL_NAMES = ('Ch1', 'Ch2')
+
+KPI_COLUMNS = (
+    *(f'{ch_name}_{key}' for ch_name in CHANNEL_NAMES for key in CHANNEL_KPI_KEYS),
+    *(f'Cross_{key}' for key in CROSS_KPI_KEYS),
+)
+
+KPI_INDEX = {name: i for i, name in enumerate(KPI_COLUMNS)}
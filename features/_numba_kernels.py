@@ -0,0 +1,201 @@
+"""
+_numba_kernels.py
+=================
+Numba JIT 커널 (features_C 내부 전용)
+
+주요 기능:
+- Higuchi FD / DFA 단일 신호 커널
+- Sample Entropy 커널 (Chebyshev 거리, 오프셋별 일치 구간 길이 누적)
+- 배치 커널: 2D (n_signals, n_times) 입력의 Sample Entropy + Higuchi FD + DFA를
+  신호 병렬(prange)로 한 번에 처리
+
+antropy의 higuchi_fd / detrended_fluctuation 알고리즘을 그대로 옮기되,
+채널마다 별도 호출(디스패치 + DFA 스케일 재계산)하지 않도록 한 번의 컴파일된 루프로 묶습니다.
+공개 커널은 명시적 시그니처로 import 시점에 즉시(eager) 컴파일하고, cache=True로
+컴파일 결과를 __pycache__에 저장하여 프로세스 재시작 시 재컴파일을 피합니다.
+(첫 Epoch 호출에서 JIT 지연이 발생하지 않음)
+"""
+
+from math import floor, log
+
+import numpy as np
+from numba import njit, prange
+
+# antropy.utils.epsilon 과 동일 (회귀 분모 0 방지)
+_REG_EPSILON = 1e-9
+
+# 공개 커널 시그니처 (입력은 C-contiguous float64 배열, kmax는 int64)
+_SIG_SAMPLE_ENTROPY = "float64(float64[::1], int64, float64)"
+_SIG_NONLINEAR_BATCH = "UniTuple(float64[::1], 3)(float64[:, ::1], int64, int64, float64[::1])"
+
+
+@njit(cache=True)
+def _linear_regression(x, y):
+    """1D 최소제곱 회귀 (slope, intercept)."""
+    n_times = x.size
+    sx2 = 0.0
+    sx = 0.0
+    sy = 0.0
+    sxy = 0.0
+    for j in range(n_times):
+        sx2 += x[j] ** 2
+        sx += x[j]
+        sxy += x[j] * y[j]
+        sy += y[j]
+    den = n_times * sx2 - (sx ** 2)
+    num = n_times * sxy - sx * sy
+    slope = num / (den + _REG_EPSILON)
+    intercept = sy / n_times - slope * sx / n_times
+    return slope, intercept
+
+
+@njit(cache=True)
+def _log_n(min_n, max_n, factor):
+    """min_n부터 factor배씩 늘린 정수 스케일 목록 (DFA 박스 크기, 중복 제거)."""
+    max_i = int(floor(log(1.0 * max_n / min_n) / log(factor)))
+    ns = [int(min_n)]
+    for i in range(max_i + 1):
+        n = int(floor(min_n * (factor ** i)))
+        if n > ns[-1]:
+            ns.append(n)
+    return np.array(ns, dtype=np.int64)
+
+
+@njit(cache=True)
+def _higuchi_fd(x, kmax):
+    """Higuchi Fractal Dimension (단일 채널)."""
+    n_times = x.size
+    x_reg = np.empty(kmax)
+    y_reg = np.empty(kmax)
+    for k in range(1, kmax + 1):
+        m_lm = 0.0
+        for m in range(k):
+            ll = 0.0
+            n_max = int(floor((n_times - m - 1) / k))
+            for j in range(1, n_max + 1):
+                ll += abs(x[m + j * k] - x[m + (j - 1) * k])
+            ll /= k
+            ll *= (n_times - 1) / (k * n_max)
+            m_lm += ll
+        m_lm /= k
+        x_reg[k - 1] = log(1.0 / k)
+        y_reg[k - 1] = log(m_lm) if m_lm > 0 else -np.inf
+    slope, _ = _linear_regression(x_reg, y_reg)
+    return slope
+
+
+@njit(cache=True)
+def _dfa(x, nvals):
+    """Detrended Fluctuation Analysis (단일 채널, 박스 크기 nvals는 호출자가 공유)."""
+    n_times = x.size
+    # 누적합(walk)은 채널당 한 번만 계산하여 모든 스케일이 재사용
+    walk = np.cumsum(x - x.mean())
+    fluctuations = np.zeros(len(nvals))
+
+    for i_n in range(len(nvals)):
+        n = nvals[i_n]
+        n_boxes = n_times // n
+        ran_n = np.arange(n).astype(np.float64)
+        total = 0.0
+        for b in range(n_boxes):
+            box = walk[b * n:(b + 1) * n]
+            slope, intercept = _linear_regression(ran_n, box)
+            resid = 0.0
+            for t in range(n):
+                diff = box[t] - (intercept + slope * ran_n[t])
+                resid += diff * diff
+            total += resid / n
+        fluctuations[i_n] = np.sqrt(total / n_boxes)
+
+    # 변동값 0인 스케일은 로그 회귀에서 제외
+    nonzero = np.nonzero(fluctuations)[0]
+    if len(nonzero) == 0:
+        return np.nan
+    slope, _ = _linear_regression(
+        np.log(nvals[nonzero].astype(np.float64)), np.log(fluctuations[nonzero])
+    )
+    return slope
+
+
+@njit(_SIG_SAMPLE_ENTROPY, cache=True)
+def sample_entropy(x, order, r):
+    """
+    Sample Entropy (Chebyshev 거리, antropy._numba_sampen과 동일한 결과).
+
+    오프셋마다 |x[p] - x[p + offset]| < r 인 연속 구간 길이(run)를 한 번의 순회로 누적하여,
+    길이 order / order+1 템플릿 일치 개수를 창(window)마다 다시 세지 않습니다.
+
+    Parameters
+    ----------
+    x : np.ndarray
+        (n_times,) C-contiguous float64 배열.
+    order : int
+        임베딩 차원 (템플릿 길이).
+    r : float
+        허용 오차 (tolerance).
+
+    Returns
+    -------
+    float
+        Sample Entropy. 길이 order 일치가 없으면 NaN, order+1 일치가 없으면 inf.
+    """
+    size = x.size
+    numerator = 0
+    denominator = 0
+    for offset in range(1, size - order):
+        n_pos = size - offset
+        run = 0
+        for p in range(n_pos):
+            if abs(x[p] - x[p + offset]) >= r:
+                run = 0
+            else:
+                run += 1
+            if run >= order:
+                # 길이 order 템플릿: 끝 위치 order-1 ~ n_pos-2
+                if order - 1 <= p <= n_pos - 2:
+                    denominator += 1
+                # 길이 order+1 템플릿: 끝 위치 order ~ n_pos-1
+                if run > order:
+                    numerator += 1
+
+    if denominator == 0:
+        return np.nan  # 길이 order 템플릿 일치 없음 (정의 불가)
+    elif numerator == 0:
+        return np.inf
+    return -log(numerator / denominator)
+
+
+@njit(_SIG_NONLINEAR_BATCH, cache=True, parallel=True)
+def nonlinear_kernels_batch(X, kmax, order, r):
+    """
+    신호별 Sample Entropy, Higuchi FD, DFA 지수를 한 번에 계산 (신호 병렬).
+
+    하나의 Python 스레드에서 호출해야 합니다 (numba workqueue 레이어 제약).
+
+    Parameters
+    ----------
+    X : np.ndarray
+        (n_signals, n_times) C-contiguous float64 배열 (예: Epoch × 채널을 펼친 행).
+    kmax : int
+        Higuchi 최대 지연(샘플 수).
+    order : int
+        Sample Entropy 임베딩 차원.
+    r : np.ndarray
+        (n_signals,) 신호별 Sample Entropy 허용 오차.
+
+    Returns
+    -------
+    (np.ndarray, np.ndarray, np.ndarray)
+        신호별 (sampen, higuchi_fd, dfa).
+    """
+    n_signals, n_times = X.shape
+    # DFA 박스 크기는 신호 길이에만 의존하므로 모든 신호가 공유
+    nvals = _log_n(4, 0.1 * n_times, 1.2)
+    sampen = np.empty(n_signals)
+    hfd = np.empty(n_signals)
+    dfa = np.empty(n_signals)
+    for i in prange(n_signals):
+        sampen[i] = sample_entropy(X[i], order, r[i])
+        hfd[i] = _higuchi_fd(X[i], kmax)
+        dfa[i] = _dfa(X[i], nvals)
+    return sampen, hfd, dfa
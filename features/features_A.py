@@ -8,15 +8,31 @@ Time-Domain Feature Extraction (Full Feature Set)
 - Statistical Features (6개)
 - Pattern Features (4개)
 - Hjorth Parameters (2개)
+- 배치 API: (..., n_times) 배열 전체를 축 단위 리덕션으로 처리 (compute_time_features_batch)
 
 총 17개 Time-Domain KPI 추출
 """
 
+import logging
+
 import numpy as np
 from scipy import stats
 from scipy.signal import find_peaks
 from typing import Dict
 
+from .utils import retry_per_signal
+
+logger = logging.getLogger(__name__)
+
+
+# KPI 키 목록 (반환 딕셔너리 순서와 동일)
+_TIME_KPI_KEYS = [
+    'amp_max', 'amp_min', 'amp_p2p', 'amp_mean', 'amp_rms',
+    'stat_mean', 'stat_std', 'stat_variance', 'stat_median', 'stat_skewness', 'stat_kurtosis',
+    'zcr', 'slope_mean', 'peak_count', 'peak_mean_height',
+    'hjorth_mobility', 'hjorth_complexity'
+]
+
 
 def compute_time_features(data: np.ndarray, sr: int) -> Dict[str, float]:
     """
@@ -34,62 +50,82 @@ def compute_time_features(data: np.ndarray, sr: int) -> Dict[str, float]:
     dict
         Time-Domain KPI 딕셔너리.
     """
-    features = {}
+    batch = compute_time_features_batch(np.asarray(data)[np.newaxis, :], sr)
+    return {key: values[0] for key, values in batch.items()}
+
+
+def compute_time_features_batch(data: np.ndarray, sr: int) -> Dict[str, np.ndarray]:
+    """
+    여러 신호(Epoch × 채널)의 Time-Domain 특징을 한 번에 추출.
+
+    각 통계량을 마지막 축 기준 numpy 리덕션 한 번으로 계산합니다
+    (신호별 Python 루프 없음, Peak Detection 제외).
+
+    Parameters
+    ----------
+    data : np.ndarray
+        (..., n_times) array, 예: (n_epochs, n_channels, n_times).
+    sr : int
+        샘플링 레이트 (Hz).
+
+    Returns
+    -------
+    dict
+        {KPI 이름: data.shape[:-1] 형태의 배열} 딕셔너리.
+    """
+    data = np.asarray(data)
+    lead_shape = data.shape[:-1]
+    features = {key: np.full(lead_shape, np.nan) for key in _TIME_KPI_KEYS}
     epsilon = 1e-10  # Division by zero 방지
 
     try:
         # ===== 1. Amplitude Features (5개) =====
-        features['amp_max'] = np.max(data)
-        features['amp_min'] = np.min(data)
-        features['amp_p2p'] = np.ptp(data)  # Peak-to-Peak
-        features['amp_mean'] = np.mean(data)
-        features['amp_rms'] = np.sqrt(np.mean(np.square(data)))
+        features['amp_max'][...] = np.max(data, axis=-1)
+        features['amp_min'][...] = np.min(data, axis=-1)
+        features['amp_p2p'][...] = features['amp_max'] - features['amp_min']  # Peak-to-Peak
+        features['amp_mean'][...] = np.mean(data, axis=-1)
+        features['amp_rms'][...] = np.sqrt(np.mean(np.square(data), axis=-1))
 
         # ===== 2. Statistical Features (6개) =====
-        features['stat_mean'] = np.mean(data)
-        features['stat_std'] = np.std(data)
-        features['stat_variance'] = np.var(data)
-        features['stat_median'] = np.median(data)
-        features['stat_skewness'] = stats.skew(data)
-        features['stat_kurtosis'] = stats.kurtosis(data)
+        features['stat_mean'][...] = features['amp_mean']
+        var_x = np.var(data, axis=-1)
+        features['stat_std'][...] = np.sqrt(var_x)
+        features['stat_variance'][...] = var_x
+        features['stat_median'][...] = np.median(data, axis=-1)
+        features['stat_skewness'][...] = stats.skew(data, axis=-1)
+        features['stat_kurtosis'][...] = stats.kurtosis(data, axis=-1)
 
         # ===== 3. Pattern Features (4개) =====
-        # Zero Crossing Rate
-        zero_crossings = np.where(np.diff(np.sign(data)))[0]
-        features['zcr'] = len(zero_crossings) / len(data)
+        # Zero Crossing Rate (부호가 바뀌는 지점 수 / 샘플 수)
+        zero_crossings = np.count_nonzero(np.diff(np.sign(data), axis=-1), axis=-1)
+        features['zcr'][...] = zero_crossings / data.shape[-1]
 
         # Slope Mean (평균 기울기)
-        dx = np.diff(data)
-        features['slope_mean'] = np.mean(np.abs(dx))
-
-        # Peak Detection
-        peaks, properties = find_peaks(data, height=0)
-        features['peak_count'] = len(peaks)
-        if len(peaks) > 0:
-            features['peak_mean_height'] = np.mean(properties['peak_heights'])
-        else:
-            features['peak_mean_height'] = 0.0
+        dx = np.diff(data, axis=-1)
+        features['slope_mean'][...] = np.mean(np.abs(dx), axis=-1)
+
+        # Peak Detection (find_peaks는 1D 전용이므로 신호별 루프)
+        for idx in np.ndindex(lead_shape):
+            peaks, properties = find_peaks(data[idx], height=0)
+            features['peak_count'][idx] = len(peaks)
+            if len(peaks) > 0:
+                features['peak_mean_height'][idx] = np.mean(properties['peak_heights'])
+            else:
+                features['peak_mean_height'][idx] = 0.0
 
         # ===== 4. Hjorth Parameters (2개) =====
         # Hjorth Mobility = sqrt(var(dx) / var(x))
-        var_x = np.var(data)
-        var_dx = np.var(dx)
-        features['hjorth_mobility'] = np.sqrt(var_dx / (var_x + epsilon))
+        var_dx = np.var(dx, axis=-1)
+        features['hjorth_mobility'][...] = np.sqrt(var_dx / (var_x + epsilon))
 
         # Hjorth Complexity = Mobility(dx) / Mobility(x)
-        ddx = np.diff(dx)
-        var_ddx = np.var(ddx)
+        var_ddx = np.var(np.diff(dx, axis=-1), axis=-1)
         mobility_dx = np.sqrt(var_ddx / (var_dx + epsilon))
-        features['hjorth_complexity'] = mobility_dx / (features['hjorth_mobility'] + epsilon)
-
-    except Exception as e:
-        # 전체 실패 시 모든 값 NaN
-        for key in [
-            'amp_max', 'amp_min', 'amp_p2p', 'amp_mean', 'amp_rms',
-            'stat_mean', 'stat_std', 'stat_variance', 'stat_median', 'stat_skewness', 'stat_kurtosis',
-            'zcr', 'slope_mean', 'peak_count', 'peak_mean_height',
-            'hjorth_mobility', 'hjorth_complexity'
-        ]:
-            features[key] = np.nan
+        features['hjorth_complexity'][...] = mobility_dx / (features['hjorth_mobility'] + epsilon)
+
+    except Exception:
+        # 배치 실패 시 신호별로 다시 계산 (실패한 신호만 NaN)
+        logger.warning("Time-domain batch failed; retrying per signal", exc_info=True)
+        retry_per_signal(compute_time_features_batch, features, sr, data)
 
     return features
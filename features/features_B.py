@@ -8,15 +8,23 @@ Frequency-Domain Feature Extraction (Full Feature Set)
 - Spectral Shape (5개: Peak, Centroid, SEF90, Entropy, Flatness)
 - FOOOF Features (2개: Aperiodic Exp, Offset)
 - Ratios (2개: Alpha/Beta, Theta/Beta)
+- 배치 API: (..., n_times) 배열 전체를 한 번의 Welch 호출로 처리 (compute_freq_features_batch)
 
 총 21개 Frequency-Domain KPI 추출
 """
 
+import logging
+
 import numpy as np
+from numba import get_num_threads
+from scipy.fft import set_workers
 from scipy.signal import welch
-from scipy.integrate import simpson
 from typing import Dict
 
+from .utils import BAND_NAMES, EEG_BANDS, integrate_band_powers, retry_per_signal, safe_log_nonneg
+
+logger = logging.getLogger(__name__)
+
 # FOOOF import (실패해도 괜찮음)
 try:
     from fooof import FOOOF
@@ -25,6 +33,21 @@ except ImportError:
     FOOOF_AVAILABLE = False
 
 
+# 대역별 KPI 키 (모듈 로드 시 1회 생성, 대역 순서 = BAND_NAMES)
+_KEY_POW_ABS = tuple(f'pow_abs_{name}' for name in BAND_NAMES)
+_KEY_POW_REL = tuple(f'pow_rel_{name}' for name in BAND_NAMES)
+
+# KPI 키 목록 (반환 딕셔너리 순서와 동일)
+_FREQ_KPI_KEYS = [
+    'pow_total',
+    *_KEY_POW_ABS,
+    *_KEY_POW_REL,
+    'peak_freq_hz', 'centroid_hz', 'sef90_hz', 'spec_entropy', 'spec_flatness',
+    'aperiodic_exponent', 'aperiodic_offset',
+    'alpha_beta_ratio', 'theta_beta_ratio'
+]
+
+
 def compute_freq_features(data: np.ndarray, sr: int) -> Dict[str, float]:
     """
     Frequency-Domain 특징 추출.
@@ -41,107 +64,111 @@ def compute_freq_features(data: np.ndarray, sr: int) -> Dict[str, float]:
     dict
         Frequency-Domain KPI 딕셔너리.
     """
-    features = {}
-    epsilon = 1e-10
+    batch = compute_freq_features_batch(np.asarray(data)[np.newaxis, :], sr)
+    return {key: values[0] for key, values in batch.items()}
+
+
+def compute_freq_features_batch(data: np.ndarray, sr: int) -> Dict[str, np.ndarray]:
+    """
+    여러 신호(Epoch × 채널)의 Frequency-Domain 특징을 한 번에 추출.
+
+    Welch PSD를 마지막 축 기준으로 한 번만 호출하고, 모든 KPI를 선행 축에 대한
+    numpy 연산으로 계산합니다 (신호별 Python 루프 없음, FOOOF 제외).
+
+    Parameters
+    ----------
+    data : np.ndarray
+        (..., n_times) array, 예: (n_epochs, n_channels, n_times).
+    sr : int
+        샘플링 레이트 (Hz).
 
-    # 주파수 대역 정의
-    bands = {
-        'delta': (0.5, 4.0),
-        'theta': (4.0, 8.0),
-        'alpha': (8.0, 13.0),
-        'beta': (13.0, 30.0),
-        'gamma': (30.0, 50.0),
-    }
+    Returns
+    -------
+    dict
+        {KPI 이름: data.shape[:-1] 형태의 배열} 딕셔너리.
+    """
+    data = np.asarray(data)
+    lead_shape = data.shape[:-1]
+    features = {key: np.full(lead_shape, np.nan) for key in _FREQ_KPI_KEYS}
+    epsilon = 1e-10
 
     try:
-        # ===== PSD 계산 (Welch's Method) =====
-        nperseg = min(int(sr * 2), len(data))  # 2초 window
-        freqs, psd = welch(data, fs=sr, nperseg=nperseg)
+        # ===== PSD 계산 (Welch's Method, 모든 신호 일괄) =====
+        nperseg = min(int(sr * 2), data.shape[-1])  # 2초 window
+        # welch 내부 scipy.fft 호출을 프로세스의 numba 스레드 예산만큼 병렬화
+        with set_workers(get_num_threads()):
+            freqs, psd = welch(data, fs=sr, nperseg=nperseg, axis=-1)
 
         # ===== 1. Power Features (12개) =====
-        band_powers = {}
-        for band_name, (fmin, fmax) in bands.items():
-            idx = np.logical_and(freqs >= fmin, freqs <= fmax)
-            if np.sum(idx) > 0:
-                # Absolute Power (적분)
-                band_powers[band_name] = simpson(psd[idx], x=freqs[idx])
-            else:
-                band_powers[band_name] = 0.0
+        # Absolute Power (누적 사다리꼴 적분 룩업, 빈이 없는 대역은 0.0)
+        abs_powers, _ = integrate_band_powers(psd, freqs, EEG_BANDS)
 
         # Total Power
-        total_power = sum(band_powers.values())
-        features['pow_total'] = total_power
-
-        # Absolute Powers
-        for band_name, power in band_powers.items():
-            features[f'pow_abs_{band_name}'] = power
+        total_power = abs_powers.sum(axis=-1)
+        features['pow_total'][...] = total_power
 
-        # Relative Powers (%)
-        for band_name, power in band_powers.items():
-            features[f'pow_rel_{band_name}'] = (power / (total_power + epsilon)) * 100.0
+        # Absolute / Relative Powers (%)
+        rel_powers = abs_powers / (total_power[..., np.newaxis] + epsilon) * 100.0
+        for band_i, (abs_key, rel_key) in enumerate(zip(_KEY_POW_ABS, _KEY_POW_REL)):
+            features[abs_key][...] = abs_powers[..., band_i]
+            features[rel_key][...] = rel_powers[..., band_i]
 
         # ===== 2. Spectral Shape (5개) =====
+        # PSD 누적합을 한 번만 계산하고, 마지막 값(PSD 총합)을 아래 KPI들이 공유
+        cumsum = np.cumsum(psd, axis=-1)
+        psd_sum = cumsum[..., -1]
+
         # Peak Frequency (전체 스펙트럼)
-        peak_idx = np.argmax(psd)
-        features['peak_freq_hz'] = freqs[peak_idx]
+        features['peak_freq_hz'][...] = freqs[np.argmax(psd, axis=-1)]
 
-        # Spectral Centroid
-        features['centroid_hz'] = np.sum(freqs * psd) / (np.sum(psd) + epsilon)
+        # Spectral Centroid (내적 한 번)
+        features['centroid_hz'][...] = (psd @ freqs) / (psd_sum + epsilon)
 
-        # SEF90 (Spectral Edge Frequency - 90%)
-        cumsum = np.cumsum(psd)
-        total = cumsum[-1]
-        sef90_idx = np.searchsorted(cumsum, 0.9 * total)
-        features['sef90_hz'] = freqs[min(sef90_idx, len(freqs) - 1)]
+        # SEF90 (Spectral Edge Frequency - 90%): 누적합이 처음으로 90%에 도달하는 빈
+        sef90_idx = np.argmax(cumsum >= 0.9 * psd_sum[..., np.newaxis], axis=-1)
+        features['sef90_hz'][...] = freqs[sef90_idx]
 
-        # Spectral Entropy
-        psd_norm = psd / (np.sum(psd) + epsilon)
-        features['spec_entropy'] = -np.sum(psd_norm * np.log2(psd_norm + epsilon))
+        # Spectral Entropy (자연로그 합을 ln 2로 한 번 나눠 bit 단위로 변환)
+        psd_norm = psd / (psd_sum[..., np.newaxis] + epsilon)
+        features['spec_entropy'][...] = (
+            -np.sum(psd_norm * safe_log_nonneg(psd_norm), axis=-1) / np.log(2)
+        )
 
         # Spectral Flatness
-        geometric_mean = np.exp(np.mean(np.log(psd + epsilon)))
-        arithmetic_mean = np.mean(psd)
-        features['spec_flatness'] = geometric_mean / (arithmetic_mean + epsilon)
+        geometric_mean = np.exp(np.mean(safe_log_nonneg(psd), axis=-1))
+        arithmetic_mean = psd_sum / psd.shape[-1]
+        features['spec_flatness'][...] = geometric_mean / (arithmetic_mean + epsilon)
 
         # ===== 3. FOOOF Features (2개) =====
+        # FOOOF는 신호별 모델 피팅이므로 개별 루프 (미설치 시 NaN 유지)
         if FOOOF_AVAILABLE:
-            try:
-                fm = FOOOF(
-                    peak_width_limits=[0.5, 12.0],
-                    max_n_peaks=8,
-                    min_peak_height=0.0,
-                    aperiodic_mode='fixed',
-                    verbose=False
-                )
-                fm.fit(freqs, psd, freq_range=[0.5, 50.0])
-                ap_params = fm.aperiodic_params_
-                features['aperiodic_exponent'] = ap_params[1]  # Exponent
-                features['aperiodic_offset'] = ap_params[0]    # Offset
-            except Exception:
-                features['aperiodic_exponent'] = np.nan
-                features['aperiodic_offset'] = np.nan
-        else:
-            features['aperiodic_exponent'] = np.nan
-            features['aperiodic_offset'] = np.nan
+            for idx in np.ndindex(lead_shape):
+                try:
+                    fm = FOOOF(
+                        peak_width_limits=[0.5, 12.0],
+                        max_n_peaks=8,
+                        min_peak_height=0.0,
+                        aperiodic_mode='fixed',
+                        verbose=False
+                    )
+                    fm.fit(freqs, psd[idx], freq_range=[0.5, 50.0])
+                    ap_params = fm.aperiodic_params_
+                    features['aperiodic_exponent'][idx] = ap_params[1]  # Exponent
+                    features['aperiodic_offset'][idx] = ap_params[0]    # Offset
+                except Exception:
+                    pass
 
         # ===== 4. Ratios (2개) =====
-        alpha_power = band_powers.get('alpha', 0.0)
-        beta_power = band_powers.get('beta', 0.0)
-        theta_power = band_powers.get('theta', 0.0)
-
-        features['alpha_beta_ratio'] = alpha_power / (beta_power + epsilon)
-        features['theta_beta_ratio'] = theta_power / (beta_power + epsilon)
-
-    except Exception as e:
-        # 전체 실패 시 모든 값 NaN
-        for key in [
-            'pow_total',
-            'pow_abs_delta', 'pow_abs_theta', 'pow_abs_alpha', 'pow_abs_beta', 'pow_abs_gamma',
-            'pow_rel_delta', 'pow_rel_theta', 'pow_rel_alpha', 'pow_rel_beta', 'pow_rel_gamma',
-            'peak_freq_hz', 'centroid_hz', 'sef90_hz', 'spec_entropy', 'spec_flatness',
-            'aperiodic_exponent', 'aperiodic_offset',
-            'alpha_beta_ratio', 'theta_beta_ratio'
-        ]:
-            features[key] = np.nan
+        alpha_power = features['pow_abs_alpha']
+        beta_power = features['pow_abs_beta']
+        theta_power = features['pow_abs_theta']
+
+        features['alpha_beta_ratio'][...] = alpha_power / (beta_power + epsilon)
+        features['theta_beta_ratio'][...] = theta_power / (beta_power + epsilon)
+
+    except Exception:
+        # 배치 실패 시 신호별로 다시 계산 (실패한 신호만 NaN)
+        logger.warning("Frequency-domain batch failed; retrying per signal", exc_info=True)
+        retry_per_signal(compute_freq_features_batch, features, sr, data)
 
     return features
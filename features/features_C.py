@@ -7,14 +7,34 @@ Nonlinear/Dynamics Feature Extraction (Full Feature Set)
 - Entropy Features (4개): Sample, Spectral, Permutation, SVD
 - Complexity Features (3개): Higuchi FD, Petrosian FD, Katz FD
 - Dynamics Features (2개): Lempel-Ziv Complexity, Detrended Fluctuation Analysis
+- 배치 API: (..., n_times) 배열 전체를 numba 병렬 커널 + axis 일괄 계산으로 처리
+  (compute_nonlinear_features_batch)
 
 총 9개 Nonlinear KPI 추출
 """
 
+import logging
+
 import numpy as np
 import antropy as ant
 from typing import Dict
 
+from ._numba_kernels import nonlinear_kernels_batch
+from .utils import retry_per_signal
+
+logger = logging.getLogger(__name__)
+
+# KPI 키 목록 (반환 딕셔너리 순서와 동일)
+_NONLINEAR_KPI_KEYS = (
+    'sampen', 'spec_ent', 'perm_ent', 'svd_ent',
+    'higuchi_fd', 'petrosian_fd', 'katz_fd',
+    'lzc', 'dfa',
+)
+
+
+# 행 전체를 한 번에 계산하는 KPI (numba 커널 + antropy axis 계산)
+_BATCHED_KPI_KEYS = ('sampen', 'higuchi_fd', 'dfa', 'spec_ent', 'petrosian_fd', 'katz_fd')
+
 
 def compute_nonlinear_features(data: np.ndarray, sr: int) -> Dict[str, float]:
     """
@@ -32,71 +52,103 @@ def compute_nonlinear_features(data: np.ndarray, sr: int) -> Dict[str, float]:
     dict
         Nonlinear KPI 딕셔너리 (9개).
     """
-    features = {}
+    batch = compute_nonlinear_features_batch(np.asarray(data)[np.newaxis, :], sr)
+    return {key: values[0] for key, values in batch.items()}
 
-    # ===== 1. Entropy Features (4개) =====
 
-    # Sample Entropy
-    try:
-        features['sampen'] = ant.sample_entropy(data, order=2)
-    except Exception:
-        features['sampen'] = np.nan
+def compute_nonlinear_features_batch(data: np.ndarray, sr: int) -> Dict[str, np.ndarray]:
+    """
+    여러 신호(Epoch × 채널)의 Nonlinear/Dynamics 특징을 한 번에 추출.
 
-    # Spectral Entropy (normalized)
-    try:
-        features['spec_ent'] = ant.spectral_entropy(
-            data, sf=sr, method='welch', normalize=True
-        )
-    except Exception:
-        features['spec_ent'] = np.nan
+    Sample Entropy / Higuchi FD / DFA는 numba 병렬(prange) 커널 한 번으로,
+    Spectral Entropy / Petrosian / Katz는 antropy의 axis 인자로 일괄 계산하고,
+    1D 전용인 Permutation / SVD Entropy와 LZC만 신호별 루프를 돕니다.
+    일괄 계산이 예외로 실패하면 경고를 남기고 신호별로 다시 계산하여 실패한 신호만 NaN이 됩니다.
 
-    # Permutation Entropy (normalized)
-    try:
-        features['perm_ent'] = ant.perm_entropy(data, order=3, normalize=True)
-    except Exception:
-        features['perm_ent'] = np.nan
+    Parameters
+    ----------
+    data : np.ndarray
+        (..., n_times) array, 예: (n_epochs, n_channels, n_times).
+    sr : int
+        샘플링 레이트 (Hz).
 
-    # SVD Entropy (normalized)
-    try:
-        features['svd_ent'] = ant.svd_entropy(data, order=3, normalize=True)
-    except Exception:
-        features['svd_ent'] = np.nan
+    Returns
+    -------
+    dict
+        {KPI 이름: data.shape[:-1] 형태의 배열} 딕셔너리.
+    """
+    data = np.asarray(data, dtype=np.float64)
+    lead_shape = data.shape[:-1]
+    features = {key: np.full(lead_shape, np.nan) for key in _NONLINEAR_KPI_KEYS}
 
-    # ===== 2. Complexity Features (3개) =====
+    # 평탄 신호 등에서 발생하는 log/나눗셈 경고는 NaN/inf 전파로 처리
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # ===== numba 배치 커널 + axis 일괄 계산 (실패 시 신호별 재계산) =====
+        features.update(_compute_batched_kpis(data, sr))
 
-    # Higuchi Fractal Dimension
-    try:
-        features['higuchi_fd'] = ant.higuchi_fd(data, kmax=10)
-    except Exception:
-        features['higuchi_fd'] = np.nan
+        # ===== 1D 전용 antropy 함수: 신호별 루프 (실패한 신호만 NaN) =====
+        rows = data.reshape(-1, data.shape[-1])
+        flat = {key: features[key].reshape(-1) for key in ('perm_ent', 'svd_ent', 'lzc')}  # features의 뷰
+        for i, row in enumerate(rows):
+            try:
+                # Permutation Entropy (normalized)
+                flat['perm_ent'][i] = ant.perm_entropy(row, order=3, normalize=True)
 
-    # Petrosian Fractal Dimension
-    try:
-        features['petrosian_fd'] = ant.petrosian_fd(data)
-    except Exception:
-        features['petrosian_fd'] = np.nan
+                # SVD Entropy (normalized)
+                flat['svd_ent'][i] = ant.svd_entropy(row, order=3, normalize=True)
 
-    # Katz Fractal Dimension
-    try:
-        features['katz_fd'] = ant.katz_fd(data)
-    except Exception:
-        features['katz_fd'] = np.nan
+                # Lempel-Ziv Complexity (이진화 필수)
+                # bool 배열 그대로 전달 (antropy가 uint32로 직접 변환; int 복사본 불필요.
+                #  uint8 등 'u' dtype은 문자열 변환 경로로 빠지므로 사용하지 않음)
+                flat['lzc'][i] = ant.lziv_complexity(row > np.mean(row), normalize=True)
+            except Exception:
+                pass
 
-    # ===== 3. Dynamics Features (2개) =====
+    return features
 
-    # Lempel-Ziv Complexity (이진화 필수)
-    try:
-        # Step 1: 이진화 (threshold = mean)
-        binary_data = (data > np.mean(data)).astype(int)
-        # Step 2: LZC 계산 (normalized)
-        features['lzc'] = ant.lziv_complexity(binary_data, normalize=True)
-    except Exception:
-        features['lzc'] = np.nan
 
-    # Detrended Fluctuation Analysis
+def _compute_batched_kpis(data: np.ndarray, sr: int) -> Dict[str, np.ndarray]:
+    """
+    일괄 계산 KPI(_BATCHED_KPI_KEYS)를 신호 전체에 대해 한 번에 계산.
+
+    Parameters
+    ----------
+    data : np.ndarray
+        (..., n_times) float64 array (1D 단일 신호도 가능).
+    sr : int
+        샘플링 레이트 (Hz).
+
+    Returns
+    -------
+    dict
+        {KPI 이름: data.shape[:-1] 형태의 배열} 딕셔너리.
+        일괄 계산이 실패하면 신호별로 다시 계산하여 실패한 신호만 NaN.
+    """
+    lead_shape = data.shape[:-1]
+    features = {key: np.full(lead_shape, np.nan) for key in _BATCHED_KPI_KEYS}
+
     try:
-        features['dfa'] = ant.detrended_fluctuation(data)
+        # 선행 축을 펼친 (n_signals, n_times) 행 단위로 계산 (numba 커널 입력은 C-contiguous)
+        rows = np.ascontiguousarray(data.reshape(-1, data.shape[-1]))
+
+        # ===== numba 배치 커널: Sample Entropy + Higuchi FD + DFA =====
+        # Sample Entropy 허용 오차 r = 0.2 * std (antropy 기본값)
+        tolerance = 0.2 * np.std(rows, axis=-1)
+        sampen, higuchi_fd, dfa = nonlinear_kernels_batch(rows, 10, 2, tolerance)
+        features['sampen'][...] = sampen.reshape(lead_shape)
+        features['higuchi_fd'][...] = higuchi_fd.reshape(lead_shape)
+        features['dfa'][...] = dfa.reshape(lead_shape)
+
+        # ===== axis 일괄 계산: Spectral Entropy, Petrosian FD, Katz FD =====
+        features['spec_ent'][...] = ant.spectral_entropy(
+            data, sf=sr, method='welch', normalize=True, axis=-1
+        )
+        features['petrosian_fd'][...] = ant.petrosian_fd(data, axis=-1)
+        features['katz_fd'][...] = ant.katz_fd(data, axis=-1)
+
     except Exception:
-        features['dfa'] = np.nan
+        # 배치 실패 시 신호별로 다시 계산 (실패한 신호만 NaN)
+        logger.warning("Nonlinear batch kernels failed; retrying per signal", exc_info=True)
+        retry_per_signal(_compute_batched_kpis, features, sr, data)
 
-    return features
\ No newline at end of file
+    return features
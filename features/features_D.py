@@ -7,15 +7,31 @@ Cross-Channel Connectivity & Asymmetry Feature Extraction
 - Connectivity (Coherence): 5 bands (Delta, Theta, Alpha, Beta, Gamma)
 - Correlation: Pearson correlation between channels
 - Asymmetry (Power): ln(Ch2_Power) - ln(Ch1_Power) for 5 bands
+- 배치 API: 여러 Epoch를 rfft 한 번으로 처리 (compute_cross_features_batch)
 
 총 11개 Cross-Channel KPI 추출
 """
 
+import logging
+
 import numpy as np
-from scipy import signal
-from scipy.integrate import simpson
 from typing import Dict
 
+from .utils import (
+    BAND_NAMES, EEG_BANDS, band_means, get_band_slices, integrate_band_powers, retry_per_signal,
+    welch_psd_csd,
+)
+
+logger = logging.getLogger(__name__)
+
+# 대역별 KPI 키 (모듈 로드 시 1회 생성, 대역 순서 = BAND_NAMES)
+_KEY_COH = tuple(f'coh_{name}' for name in BAND_NAMES)
+_KEY_ASYM = tuple(f'asym_power_{name}' for name in BAND_NAMES)
+
+
+# KPI 키 목록 (반환 딕셔너리 순서와 동일)
+_CROSS_KPI_KEYS = [*_KEY_COH, 'pearson_corr', *_KEY_ASYM]
+
 
 def compute_cross_features(data_ch1: np.ndarray, data_ch2: np.ndarray, sr: int) -> Dict[str, float]:
     """
@@ -35,73 +51,78 @@ def compute_cross_features(data_ch1: np.ndarray, data_ch2: np.ndarray, sr: int)
     dict
         Cross-Channel KPI 딕셔너리 (11개).
     """
-    features = {}
-    epsilon = 1e-10
+    batch = compute_cross_features_batch(
+        np.asarray(data_ch1)[np.newaxis, :], np.asarray(data_ch2)[np.newaxis, :], sr
+    )
+    return {key: values[0] for key, values in batch.items()}
+
+
+def compute_cross_features_batch(data_ch1: np.ndarray, data_ch2: np.ndarray, sr: int) -> Dict[str, np.ndarray]:
+    """
+    여러 Epoch의 Cross-Channel 특징을 한 번에 추출.
+
+    모든 Epoch의 두 채널 세그먼트를 rfft 한 번으로 변환하여 PSD/CSD를 구하고,
+    모든 KPI를 선행 축에 대한 numpy 연산으로 계산합니다.
 
-    # 주파수 대역 정의
-    bands = {
-        'delta': (0.5, 4.0),
-        'theta': (4.0, 8.0),
-        'alpha': (8.0, 13.0),
-        'beta': (13.0, 30.0),
-        'gamma': (30.0, 50.0),
-    }
+    Parameters
+    ----------
+    data_ch1 : np.ndarray
+        (..., n_times) array, Channel 1 신호 (예: (n_epochs, n_times)).
+    data_ch2 : np.ndarray
+        data_ch1과 같은 형태의 Channel 2 신호.
+    sr : int
+        샘플링 레이트 (Hz).
+
+    Returns
+    -------
+    dict
+        {KPI 이름: data_ch1.shape[:-1] 형태의 배열} 딕셔너리.
+    """
+    data_ch1 = np.asarray(data_ch1)
+    data_ch2 = np.asarray(data_ch2)
+    lead_shape = data_ch1.shape[:-1]
+    features = {key: np.full(lead_shape, np.nan) for key in _CROSS_KPI_KEYS}
+    epsilon = 1e-10
 
     try:
-        # ===== 1. Connectivity: Coherence (5개 대역) =====
-        # scipy.signal.coherence 계산
+        # ===== 0. Welch PSD + CSD (세그먼트 FFT 1회로 모든 Epoch·두 채널 공유) =====
         nperseg = int(sr * 2)  # 2초 윈도우
-        freqs, coh = signal.coherence(data_ch1, data_ch2, fs=sr, nperseg=nperseg)
-
-        for band_name, (fmin, fmax) in bands.items():
-            try:
-                # 해당 대역의 주파수 인덱스
-                band_idx = np.logical_and(freqs >= fmin, freqs <= fmax)
-                if np.sum(band_idx) > 0:
-                    # 해당 대역 Coherence의 평균
-                    features[f'coh_{band_name}'] = np.mean(coh[band_idx])
-                else:
-                    features[f'coh_{band_name}'] = np.nan
-            except Exception:
-                features[f'coh_{band_name}'] = np.nan
-
-        # ===== 2. Correlation: Pearson Correlation =====
-        try:
-            corr_matrix = np.corrcoef(data_ch1, data_ch2)
-            features['pearson_corr'] = corr_matrix[0, 1]
-        except Exception:
-            features['pearson_corr'] = np.nan
+        freqs, psd_ch1, psd_ch2, csd = welch_psd_csd(data_ch1, data_ch2, sr, nperseg)
+
+        # 0/0 빈, 평탄 신호 등은 경고 없이 NaN으로 전파
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # ===== 1. Connectivity: Coherence (5개 대역) =====
+            # |Pxy|^2 / (Pxx * Pyy)
+            coh = np.abs(csd) ** 2 / (psd_ch1 * psd_ch2)
+
+            # 대역별 Coherence 평균 (캐시된 인덱스 구간 + reduceat 1회, 빈 대역은 NaN)
+            coh_means = band_means(coh, get_band_slices(freqs, EEG_BANDS))
+            for band_i, coh_key in enumerate(_KEY_COH):
+                features[coh_key][...] = coh_means[..., band_i]
+
+            # ===== 2. Correlation: Pearson Correlation =====
+            # 평균 제거 후 내적 (np.corrcoef와 동일, 평탄 신호는 NaN)
+            centered_ch1 = data_ch1 - data_ch1.mean(axis=-1, keepdims=True)
+            centered_ch2 = data_ch2 - data_ch2.mean(axis=-1, keepdims=True)
+            features['pearson_corr'][...] = np.sum(centered_ch1 * centered_ch2, axis=-1) / np.sqrt(
+                np.sum(centered_ch1 ** 2, axis=-1) * np.sum(centered_ch2 ** 2, axis=-1)
+            )
 
         # ===== 3. Asymmetry: Power Asymmetry (5개 대역) =====
-        # 각 채널에 대해 Welch PSD 계산
-        freqs_psd, psd_ch1 = signal.welch(data_ch1, fs=sr, nperseg=nperseg)
-        _, psd_ch2 = signal.welch(data_ch2, fs=sr, nperseg=nperseg)
-
-        for band_name, (fmin, fmax) in bands.items():
-            try:
-                # 해당 대역의 주파수 인덱스
-                band_idx = np.logical_and(freqs_psd >= fmin, freqs_psd <= fmax)
-                if np.sum(band_idx) > 0:
-                    # 절대 파워 (적분)
-                    power_ch1 = simpson(psd_ch1[band_idx], x=freqs_psd[band_idx])
-                    power_ch2 = simpson(psd_ch2[band_idx], x=freqs_psd[band_idx])
-
-                    # Power Asymmetry: ln(Ch2) - ln(Ch1)
-                    # 0 또는 음수 파워 방지
-                    if power_ch1 > 0 and power_ch2 > 0:
-                        features[f'asym_power_{band_name}'] = np.log(power_ch2) - np.log(power_ch1)
-                    else:
-                        features[f'asym_power_{band_name}'] = np.nan
-                else:
-                    features[f'asym_power_{band_name}'] = np.nan
-            except Exception:
-                features[f'asym_power_{band_name}'] = np.nan
-
-    except Exception as e:
-        # 전체 실패 시 모든 값 NaN
-        for band_name in bands.keys():
-            features[f'coh_{band_name}'] = np.nan
-            features[f'asym_power_{band_name}'] = np.nan
-        features['pearson_corr'] = np.nan
+        # 절대 파워 (위에서 구한 Welch PSD를 재사용, 누적 사다리꼴 적분 룩업)
+        powers, n_bins = integrate_band_powers(np.stack([psd_ch1, psd_ch2]), freqs, EEG_BANDS)
+
+        # Power Asymmetry: ln(Ch2) - ln(Ch1), 전 대역 한 번에 계산
+        # 빈이 없는 대역 또는 0/음수 파워는 NaN
+        log_powers = np.log(np.clip(powers, epsilon, None))
+        valid = (n_bins > 0) & np.all(powers > 0, axis=0)
+        asym = np.where(valid, log_powers[1] - log_powers[0], np.nan)
+        for band_i, asym_key in enumerate(_KEY_ASYM):
+            features[asym_key][...] = asym[..., band_i]
+
+    except Exception:
+        # 배치 실패 시 Epoch별로 다시 계산 (실패한 Epoch만 NaN)
+        logger.warning("Cross-channel batch failed; retrying per epoch", exc_info=True)
+        retry_per_signal(compute_cross_features_batch, features, sr, data_ch1, data_ch2)
 
     return features
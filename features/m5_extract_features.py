@@ -7,7 +7,6 @@ import numpy as np
 from typing import List, Dict, Any, Optional
 import logging  # (🔥 신규)
 from tqdm.auto import tqdm  # (🔥 신규)
-import traceback # (🔥 신규) 오류 로깅용
 
 # --- 1. 각 특징별 '일꾼' 함수들을 임포트합니다 ---
 from .features_A import get_A_features
@@ -48,15 +47,16 @@ def extract_features_from_epochs(epochs_A: Optional[mne.Epochs], epochs_BC: Opti
         # (n_epochs, n_channels, n_samples) 3D 배열 반환
         all_data_BC = epochs_BC.get_data(picks='eeg')
         
+        # MNE Epochs 객체의 숫자 라벨(1, 2 등) 열은 루프 전에 한 번만 꺼냄
+        events_col = epochs_BC.events[:, 2].astype(np.int64, copy=False)
+        
         # --- (🔥 수정) Tqdm 적용 ---
         # (n_epochs) 만큼 반복 (leave=False: 하위 루프 완료 시 진행률 표시줄 삭제)
-        for i in tqdm(range(len(all_data_BC)), desc="[M5] Extracting KPIs", leave=False):
-            # (n_channels, n_samples) 2D 배열 전달
-            epoch_data = all_data_BC[i]
-            
-            # MNE Epochs 객체에서 숫자 라벨(1, 2 등) 가져오기
-            numeric_label = epochs_BC.events[i, 2] 
-            
+        # epoch_data: (n_channels, n_samples) 2D 배열
+        for i, (epoch_data, numeric_label) in enumerate(tqdm(
+            zip(all_data_BC, events_col), total=len(all_data_BC),
+            desc="[M5] Extracting KPIs", leave=False,
+        )):
             kpi_row = {
                 'epoch_id': i,                 # Epoch 순번 (0, 1, 2...)
                 'label': numeric_label         # 1(church) 또는 2(market)
@@ -75,9 +75,11 @@ def extract_features_from_epochs(epochs_A: Optional[mne.Epochs], epochs_BC: Opti
                 
             except Exception as e:
                 # (🔥 수정) print -> logger.error
-                logger.error(f"[ERROR M5] Epoch {i} (Label: {numeric_label}) 처리 중 오류: {e}")
-                # (🔥 신규) 오류 상세 내역 로깅
-                logger.error(traceback.format_exc())
+                # 오류 상세 내역은 exc_info로 전달 (핸들러가 실제로 출력할 때만 traceback 렌더링)
+                logger.error(
+                    "[ERROR M5] Epoch %d (Label: %s) 처리 중 오류: %s", i, numeric_label, e,
+                    exc_info=True,
+                )
 
     # (🔥 수정) print -> logger.info
     logger.info(f"[M5] KPI 추출 완료: 총 {len(all_kpi_rows)}개의 유효 Epoch 처리.")
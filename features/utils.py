@@ -1,7 +1,27 @@
 # 📜 features/utils.py
 # 🛠️ [유틸리티] 여러 특징 추출 모듈에서 공통으로 사용하는 도우미 함수들
 
+from functools import lru_cache
+
 import numpy as np
+from numba import get_num_threads
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.fft import rfft, rfftfreq
+from scipy.signal import get_window
+
+# 🎚️ 공통 주파수 대역 정의 (features_B / features_D가 공유)
+EEG_BANDS = {
+    'delta': (0.5, 4.0),
+    'theta': (4.0, 8.0),
+    'alpha': (8.0, 13.0),
+    'beta': (13.0, 30.0),
+    'gamma': (30.0, 50.0),
+}
+
+# 대역 이름 튜플 (EEG_BANDS 순서, 배치 API 결과 배열의 마지막 축 순서와 동일)
+BAND_NAMES = tuple(EEG_BANDS.keys())
+# get_band_slices 캐시 키 (EEG_BANDS는 매 호출마다 튜플을 다시 만들지 않음)
+_EEG_BANDS_KEY = tuple((name, float(f_low), float(f_high)) for name, (f_low, f_high) in EEG_BANDS.items())
 
 def safe_z_score(data: np.ndarray) -> np.ndarray:
     """
@@ -37,6 +57,25 @@ def safe_log(data: np.ndarray) -> np.ndarray:
     # (PSD 등 음수가 없는 데이터는 np.log(data + epsilon)만으로도 충분)
     return np.log(np.abs(data) + epsilon)
 
+def safe_log_nonneg(data: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+    """
+    음수가 없는 데이터(PSD 등)용 '안전한' 로그 함수입니다.
+    safe_log와 달리 abs를 생략하고, epsilon을 더한 버퍼에 그대로 로그를 계산하여
+    임시 배열을 하나만 만듭니다 (out을 주면 0개).
+    (np.maximum으로 하한만 자르면 필터 저지대역처럼 1e-10 근처인 PSD 값이 달라지므로
+    safe_log와 같은 log(data + epsilon) 값을 유지)
+
+    Args:
+        data (np.ndarray): 0 이상의 값을 가진 배열
+        out (np.ndarray, optional): 결과를 기록할 버퍼 (data 자신도 가능)
+
+    Returns:
+        np.ndarray: 로그가 적용된 배열
+    """
+    epsilon = 1e-10
+    shifted = np.add(data, epsilon, out=out)
+    return np.log(shifted, out=shifted)
+
 def get_band_mask(freqs: np.ndarray, f_low: float, f_high: float) -> np.ndarray:
     """
     주파수 배열(freqs)에서 특정 대역(f_low ~ f_high)에 해당하는
@@ -52,5 +91,154 @@ def get_band_mask(freqs: np.ndarray, f_low: float, f_high: float) -> np.ndarray:
     """
     return (freqs >= f_low) & (freqs < f_high)
 
+@lru_cache(maxsize=32)
+def _band_slices_cached(n_freqs: int, f0: float, df: float, bands: tuple) -> dict:
+    """get_band_slices의 캐시 본체. 주파수 축은 (길이, 시작값, 간격)만으로 복원됩니다."""
+    freqs = f0 + df * np.arange(n_freqs)
+    return {
+        name: (int(np.searchsorted(freqs, f_low, side='left')),
+               int(np.searchsorted(freqs, f_high, side='right')))
+        for name, f_low, f_high in bands
+    }
+
+def get_band_slices(freqs: np.ndarray, bands) -> dict:
+    """
+    균일 간격 주파수 축에서 각 대역의 정수 인덱스 구간 (i_lo, i_hi)를 반환합니다.
+    `freqs[i_lo:i_hi]`는 `(freqs >= f_low) & (freqs <= f_high)` 마스크와 같은 빈을 가리키므로,
+    불리언 마스크 대신 슬라이싱을 쓸 수 있습니다.
+
+    같은 (sfreq, nperseg)로 계산된 freqs는 매 Epoch 동일하므로
+    (len(freqs), freqs[0], 간격, 대역 정의)를 키로 결과를 메모이즈합니다.
+    반환된 딕셔너리는 캐시와 공유되므로 수정하지 마세요.
+
+    Args:
+        freqs (np.ndarray): 균일 간격의 주파수 축 배열 (Welch 출력)
+        bands: {band_name: (f_low, f_high)} 매핑. 양 끝 주파수를 모두 포함합니다.
+
+    Returns:
+        dict: {band_name: (i_lo, i_hi)} (i_hi는 exclusive, i_lo == i_hi 이면 빈 대역)
+    """
+    if bands is EEG_BANDS:
+        key = _EEG_BANDS_KEY
+    else:
+        key = tuple((name, float(f_low), float(f_high)) for name, (f_low, f_high) in bands.items())
+    return _band_slices_cached(len(freqs), float(freqs[0]), float(freqs[1] - freqs[0]), key)
+
+def integrate_band_powers(psd: np.ndarray, freqs: np.ndarray, bands) -> tuple:
+    """
+    누적 사다리꼴 적분(cumulative trapezoid)으로 모든 대역의 절대 파워를 한 번에 계산합니다.
+    대역마다 불리언 마스크를 만들어 적분하는 대신, PSD를 한 번만 훑어 누적 적분 배열을 만들고
+    각 대역 파워를 `cpsd[i_hi] - cpsd[i_lo]` 룩업으로 얻습니다.
+
+    Args:
+        psd (np.ndarray): PSD 배열. 마지막 축이 주파수 축 (예: (n_freqs,) 또는 (n_channels, n_freqs))
+        freqs (np.ndarray): 균일 간격의 주파수 축 배열 (Welch 출력)
+        bands: {band_name: (f_low, f_high)} 매핑. 양 끝 주파수를 모두 포함합니다.
+
+    Returns:
+        tuple: (powers, n_bins)
+            - powers (np.ndarray): (..., n_bands) 형태의 대역별 절대 파워
+            - n_bins (np.ndarray): 대역별 주파수 빈 개수 (0이면 해당 대역에 빈이 없음)
+    """
+    slices = np.array(list(get_band_slices(freqs, bands).values()))
+    i_lo, i_hi = slices[:, 0], slices[:, 1] - 1
+    n_bins = i_hi - i_lo + 1
+
+    # cpsd[k] = freqs[0] ~ freqs[k] 구간의 사다리꼴 적분값
+    freq_res = freqs[1] - freqs[0]
+    cpsd = np.zeros_like(psd, dtype=float)
+    np.cumsum(0.5 * (psd[..., 1:] + psd[..., :-1]) * freq_res, axis=-1, out=cpsd[..., 1:])
+
+    # 빈이 없는 대역은 인덱스를 클리핑하고 파워를 0으로 둡니다
+    i_lo_c = np.clip(i_lo, 0, len(freqs) - 1)
+    i_hi_c = np.clip(i_hi, 0, len(freqs) - 1)
+    powers = np.where(n_bins > 0, cpsd[..., i_hi_c] - cpsd[..., i_lo_c], 0.0)
+    return powers, n_bins
+
+def band_means(values: np.ndarray, band_slices: dict) -> np.ndarray:
+    """
+    get_band_slices 결과의 각 인덱스 구간 평균을 np.add.reduceat 한 번으로 계산합니다.
+    (대역마다 마스크/평균을 반복 호출하는 대신 C 레벨 호출 1회)
+
+    Args:
+        values (np.ndarray): 마지막 축이 주파수 축인 배열 (예: coherence)
+        band_slices (dict): {band_name: (i_lo, i_hi)} (get_band_slices 반환값)
+
+    Returns:
+        np.ndarray: (..., n_bands) 형태의 대역별 평균. 빈이 없는 대역은 NaN.
+    """
+    slices = np.array(list(band_slices.values()))
+    counts = slices[:, 1] - slices[:, 0]
+    # [lo0, hi0, lo1, hi1, ...] 순서로 reduceat 후 짝수 번째만 취하면 겹치는 대역 경계도 처리됨.
+    # hi == len(values) 인덱스를 허용하기 위해 끝에 0을 하나 덧붙입니다.
+    padded = np.concatenate([values, np.zeros(values.shape[:-1] + (1,))], axis=-1)
+    sums = np.add.reduceat(padded, slices.ravel(), axis=-1)[..., ::2]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(counts > 0, sums / counts, np.nan)
+
+def welch_psd_csd(data_ch1: np.ndarray, data_ch2: np.ndarray, sr: float, nperseg: int) -> tuple:
+    """
+    두 채널의 Welch PSD와 교차 스펙트럼(CSD)을 한 번의 세그먼트 FFT로 계산합니다.
+    scipy.signal.welch / csd / coherence 기본값(Hann 윈도우, 50% 오버랩, 상수 detrend,
+    one-sided density)과 동일한 결과를 내지만, 채널별 STFT를 세 번 반복하지 않습니다.
+    입력에 앞쪽 축(예: Epoch 축)이 있으면 모든 행을 rfft 한 번으로 함께 처리합니다.
+
+    Args:
+        data_ch1 (np.ndarray): (..., n_times) 배열, Channel 1 신호
+        data_ch2 (np.ndarray): data_ch1과 같은 형태의 Channel 2 신호
+        sr (float): 샘플링 레이트 (Hz)
+        nperseg (int): 세그먼트 길이 (신호보다 길면 신호 길이로 줄임)
+
+    Returns:
+        tuple: (freqs, psd_ch1, psd_ch2, csd) - 스펙트럼은 (..., n_freqs) 형태
+            - coherence는 |csd|**2 / (psd_ch1 * psd_ch2) 로 얻을 수 있습니다.
+    """
+    nperseg = min(int(nperseg), np.shape(data_ch1)[-1])
+    step = nperseg - nperseg // 2
+    # 윈도우를 입력 dtype에 맞춰 float32 입력이 float64로 승격되지 않게 함
+    win = get_window('hann', nperseg).astype(np.result_type(data_ch1, np.float32), copy=False)
+    scale = 1.0 / (sr * np.sum(win ** 2))
+
+    # (2, ..., n_segments, nperseg) 뷰 -> 세그먼트별 상수 detrend + 윈도우 적용 후 rfft 한 번
+    segments = sliding_window_view(np.stack([data_ch1, data_ch2]), nperseg, axis=-1)[..., ::step, :]
+    segments = (segments - segments.mean(axis=-1, keepdims=True)) * win
+    # scipy.fft(pocketfft): 같은 길이의 twiddle 계수를 캐시하고 행 단위로 스레드 분할.
+    # 스레드 수는 프로세스의 numba 스레드 예산을 따름 (main.py Pool 워커가 코어를 나눠 씀)
+    spec = rfft(segments, axis=-1, workers=get_num_threads())
+
+    psd = np.mean(spec.real ** 2 + spec.imag ** 2, axis=-2) * scale
+    csd = np.mean(np.conj(spec[0]) * spec[1], axis=-2) * scale
+
+    # One-sided 스펙트럼: DC(및 짝수 길이의 Nyquist)를 제외한 빈을 2배
+    last = -1 if nperseg % 2 == 0 else None
+    psd[..., 1:last] *= 2
+    csd[..., 1:last] *= 2
+
+    freqs = rfftfreq(nperseg, 1.0 / sr)
+    return freqs, psd[0], psd[1], csd
+
+def retry_per_signal(batch_fn, features: dict, sr: int, *signals: np.ndarray) -> None:
+    """
+    배치 계산이 예외로 실패했을 때 신호(선행 축 인덱스)마다 다시 계산하여 features를 채웁니다.
+    실패한 신호의 KPI만 NaN으로 남으므로, 한 신호의 예외가 배치 전체를 NaN으로 만들지 않습니다.
+
+    Args:
+        batch_fn (callable): batch_fn(*signals, sr) 형태의 배치 API (1D 입력도 처리해야 함)
+        features (dict): {KPI 이름: 선행 축 형태의 배열}, 제자리에서 갱신
+        sr (int): 샘플링 레이트 (Hz)
+        *signals (np.ndarray): 같은 선행 축을 가진 (..., n_times) 입력 배열들
+    """
+    lead_shape = signals[0].shape[:-1]
+    if int(np.prod(lead_shape)) <= 1:
+        # 단일 신호는 더 나눌 수 없으므로 전체 NaN
+        for values in features.values():
+            values[...] = np.nan
+        return
+
+    for idx in np.ndindex(lead_shape):
+        single = batch_fn(*(signal[idx] for signal in signals), sr)
+        for key, value in single.items():
+            features[key][idx] = value
+
 # (필요에 따라 향후 공통으로 사용될 다른 함수들을 이곳에 추가할 수 있습니다.)
-# 예: def custom_filter(data, sfreq, f_low, f_high)...
\ No newline at end of file
+# 예: def custom_filter(data, sfreq, f_low, f_high)...
@@ -6,35 +6,47 @@ The Driver: Orchestrates parallel file processing + KPI extraction.
 Flow:
 1. Load config (analysis_config.yaml)
 2. Scan raw_data/ for EEG files
-3. Parallel process each file (joblib Parallel, n_jobs=-1)
-4. Aggregate results into DataFrame
+3. Parallel process each file (multiprocessing Pool, all CPU cores)
+4. Stream results to CSV in batches as files finish
 5. Sort columns (Subject → Condition → Cross → Ch1 → Ch2)
-6. Save CSV + summary report
+6. Save summary report
 """
 
 import os
 import sys
 import logging
+import logging.handlers
 import re
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple, Union
 import numpy as np
 import pandas as pd
 from datetime import datetime
 
-# MNE for filtering and epoching
-import mne
-from mne.filter import notch_filter, filter_data
+# SciPy for filtering, strided views for epoching
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import sosfiltfilt
 
 # Parallel processing
-from joblib import Parallel, delayed
+import multiprocessing as mp
+import numba
 from tqdm import tqdm
 
 # OmegaConf for config
 from omegaconf import OmegaConf
 
+# Numba threading layer: must be chosen before features._numba_kernels compiles.
+# With the TBB layer the parent process hangs at interpreter exit once a Pool
+# has run; each worker calls the parallel kernels from a single thread, so the
+# workqueue layer is enough. An explicit NUMBA_THREADING_LAYER still wins.
+if 'NUMBA_THREADING_LAYER' not in os.environ:
+    numba.config.THREADING_LAYER = 'workqueue'
+
 # Local modules
-from core_pipeline.feature_extractor import extract_features
+from core.preprocessor import design_filter_sos
+from core_pipeline.feature_extractor import extract_features_from_array
+from features._layout import KPI_COLUMNS
+from utils.config_loader import load_yaml_cached
 
 
 # ===== Setup Logging =====
@@ -45,22 +57,61 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def _start_log_listener() -> logging.handlers.QueueListener:
+    """
+    Route all log records through a queue drained by a background listener.
+    
+    The root logger's handlers are moved behind a QueueListener; loggers only
+    enqueue records, so the stderr write no longer blocks the caller. The queue
+    is a multiprocessing.Queue so that forked Pool workers, which inherit the
+    root QueueHandler, log through the parent's listener as well.
+    """
+    root = logging.getLogger()
+    handlers = list(root.handlers)
+    log_queue = mp.Queue(-1)
+    for handler in handlers:
+        root.removeHandler(handler)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    return listener
+
+
+def _stop_log_listener(listener: logging.handlers.QueueListener) -> None:
+    """Flush queued records and restore the root logger's direct handlers."""
+    listener.stop()
+    root = logging.getLogger()
+    for handler in [h for h in root.handlers if isinstance(h, logging.handlers.QueueHandler)]:
+        root.removeHandler(handler)
+    for handler in listener.handlers:
+        root.addHandler(handler)
+
+
+# Raw EEG filename: Subject_[G/B]_NNN.txt (compiled once at import)
+_FILENAME_RE = re.compile(r"(.+?)_([GB])_(\d{3})\.txt", re.IGNORECASE)
+
+
 # ===== Configuration =====
-def load_config(config_path: str = "configs/analysis_config.yaml") -> Dict:
+def load_config(config_path: str = "configs/analysis_config.yaml", use_cache: bool = True) -> Dict:
     """
     Load configuration from YAML file.
+    
+    The parsed config is cached next to the YAML (keyed by mtime + size) and
+    reused until the file changes; pass use_cache=False to always re-parse
+    (main() does so when the EEG_NO_CONFIG_CACHE environment variable is set).
     """
     if not os.path.exists(config_path):
         logger.error(f"Config file not found: {config_path}")
         sys.exit(1)
     
-    cfg = OmegaConf.load(config_path)
+    cfg = load_yaml_cached(config_path, use_cache=use_cache)
     logger.info(f"Config loaded from {config_path}")
     return cfg
 
 
 # ===== File Scanning =====
-def scan_raw_data(data_dir: str, pattern: str = r"(.+?)_([GB])_(\d{3})\.txt") -> List[Dict]:
+def scan_raw_data(data_dir: str, pattern: Union[str, re.Pattern] = _FILENAME_RE) -> List[Dict]:
     """
     Scan raw_data/ directory for EEG files matching pattern.
     
@@ -68,8 +119,9 @@ def scan_raw_data(data_dir: str, pattern: str = r"(.+?)_([GB])_(\d{3})\.txt") ->
     ----------
     data_dir : str
         Path to raw_data directory
-    pattern : str
-        Regex pattern for filename (Subject_[G/B]_NNN.txt)
+    pattern : str or re.Pattern
+        Regex for filename (Subject_[G/B]_NNN.txt); strings are compiled
+        case-insensitively once per call
     
     Returns
     -------
@@ -82,11 +134,14 @@ def scan_raw_data(data_dir: str, pattern: str = r"(.+?)_([GB])_(\d{3})\.txt") ->
         logger.error(f"Data directory not found: {data_dir}")
         return file_list
     
-    for filename in os.listdir(data_dir):
-        if not filename.endswith('.txt'):
-            continue
-        
-        match = re.match(pattern, filename, re.IGNORECASE)
+    if isinstance(pattern, str):
+        pattern = re.compile(pattern, re.IGNORECASE)
+    
+    with os.scandir(data_dir) as entries:
+        filenames = [entry.name for entry in entries if entry.name.endswith('.txt')]
+    
+    for filename in filenames:
+        match = pattern.match(filename)
         if not match:
             logger.warning(f"Skipped (invalid filename): {filename}")
             continue
@@ -113,6 +168,75 @@ def scan_raw_data(data_dir: str, pattern: str = r"(.+?)_([GB])_(\d{3})\.txt") ->
     return file_list
 
 
+# ===== Pool Workers =====
+# Config built once per worker by _worker_init (not pickled per file)
+_WORKER_CFG = None
+
+
+def _worker_init(cfg_dict: Dict, n_threads: int) -> None:
+    """
+    Pool initializer: rebuild the config once per worker process.
+    
+    Also caps numba threads per worker so the prange feature kernels of
+    all workers together don't oversubscribe the CPU.
+    """
+    global _WORKER_CFG
+    _WORKER_CFG = OmegaConf.create(cfg_dict)
+    numba.set_num_threads(max(1, min(n_threads, numba.config.NUMBA_NUM_THREADS)))
+
+
+def _worker_process_file(file_info: Dict) -> Dict:
+    """
+    Pool task: process one file with the worker's config.
+    """
+    return process_file_wrapper(file_info, _WORKER_CFG)
+
+
+# ===== File Loading =====
+def _find_channel_columns(columns: List[str]) -> Optional[List[int]]:
+    """
+    Resolve the positions of the Ch1/Ch2 columns from a CSV header.
+    
+    Columns are named Ch1(uV), Ch2(uV) or Ch1, Ch2; otherwise the two
+    columns after the timestamp are used.
+    """
+    for ch_names in (['Ch1(uV)', 'Ch2(uV)'], ['Ch1', 'Ch2']):
+        if all(name in columns for name in ch_names):
+            return [columns.index(name) for name in ch_names]
+    if len(columns) >= 3:  # Skip timestamp, use next 2
+        return [1, 2]
+    return None
+
+
+def _load_channels(file_path: str) -> Optional[np.ndarray]:
+    """
+    Load the two EEG channels of a CSV file as a float32 array.
+    
+    Only the header is parsed by pandas; the numeric columns are read straight
+    into an ndarray with np.loadtxt (no DataFrame construction). Files that
+    loadtxt cannot parse (e.g. empty fields) fall back to pd.read_csv.
+    
+    Returns
+    -------
+    np.ndarray or None
+        [2, n_samples] float32 array, or None if the channel columns are missing.
+    """
+    columns = pd.read_csv(file_path, nrows=0).columns.tolist()
+    ch_col_idx = _find_channel_columns(columns)
+    if ch_col_idx is None:
+        return None
+    
+    try:
+        raw = np.loadtxt(
+            file_path, delimiter=',', skiprows=1, usecols=ch_col_idx,
+            dtype=np.float32, ndmin=2,
+        )
+    except ValueError:
+        raw = pd.read_csv(file_path, usecols=ch_col_idx).to_numpy(dtype=np.float32)
+    # [n_samples, 2] -> [2, n_samples] (C-contiguous for the row-wise filter)
+    return np.ascontiguousarray(raw.T)
+
+
 # ===== Single File Processing =====
 def process_file_wrapper(file_info: Dict, cfg: Dict) -> Dict:
     """
@@ -143,62 +267,35 @@ def process_file_wrapper(file_info: Dict, cfg: Dict) -> Dict:
     
     try:
         # ===== Step 1: Load CSV =====
-        df = pd.read_csv(file_path)
-        if len(df) < 10:  # Too short
+        data_raw = _load_channels(file_path)
+        if data_raw is None:
+            logger.error(f"[{subject}_{condition}_{trial_no}] Cannot find channel columns")
+            return _return_nan_metadata(metadata)
+        if data_raw.shape[-1] < 10:  # Too short
             logger.warning(f"[{subject}_{condition}_{trial_no}] File too short (<10 samples)")
             return _return_nan_metadata(metadata)
         
-        # Extract Ch1, Ch2 (assuming columns are named Ch1(uV), Ch2(uV) or similar)
-        ch_names = ['Ch1(uV)', 'Ch2(uV)'] if 'Ch1(uV)' in df.columns else ['Ch1', 'Ch2']
-        if ch_names[0] not in df.columns:
-            # Try alternative column names
-            cols = df.columns.tolist()
-            if len(cols) >= 3:  # Skip timestamp, use next 2
-                ch_names = [cols[1], cols[2]]
-            else:
-                logger.error(f"[{subject}_{condition}_{trial_no}] Cannot find channel columns")
-                return _return_nan_metadata(metadata)
-        
-        ch1_data = df[ch_names[0]].values
-        ch2_data = df[ch_names[1]].values
-        
         sr = int(cfg.PREPROCESSING.sr)
         
         # ===== Step 2: Preprocess (Filter) =====
         try:
-            # Notch filter 60Hz
-            ch1_filtered = notch_filter(ch1_data, sr, freqs=60.0, verbose=False)
-            ch2_filtered = notch_filter(ch2_data, sr, freqs=60.0, verbose=False)
-            
-            # Bandpass 0.5-50Hz
-            ch1_filtered = filter_data(
-                ch1_filtered, sr, 
-                l_freq=cfg.PREPROCESSING.filter_band[0],
-                h_freq=cfg.PREPROCESSING.filter_band[1],
-                verbose=False
-            )
-            ch2_filtered = filter_data(
-                ch2_filtered, sr,
-                l_freq=cfg.PREPROCESSING.filter_band[0],
-                h_freq=cfg.PREPROCESSING.filter_band[1],
-                verbose=False
+            # Notch 60Hz + Bandpass 0.5-50Hz, both channels in one zero-phase pass.
+            # float32 halves memory traffic; SOS form keeps the IIR stable in fp32.
+            sos = design_filter_sos(
+                sr,
+                float(cfg.PREPROCESSING.filter_band[0]),
+                float(cfg.PREPROCESSING.filter_band[1]),
+                60.0,
+            ).astype(np.float32)
+            data_filtered = sosfiltfilt(
+                sos, data_raw, axis=-1
             )
         except Exception as e:
             logger.error(f"[{subject}_{condition}_{trial_no}] Filtering failed: {e}")
             return _return_nan_metadata(metadata)
         
-        # Stack channels for MNE
-        data_filtered = np.array([ch1_filtered, ch2_filtered])
-        
-        # ===== Step 3: Create MNE Info & Epochs =====
+        # ===== Step 3: Epoching (strided windows, no MNE objects) =====
         try:
-            info = mne.create_info(
-                ch_names=['Ch1', 'Ch2'],
-                sfreq=sr,
-                ch_types='eeg'
-            )
-            raw = mne.io.RawArray(data_filtered, info)
-            
             # Epoching: 4sec window, 50% overlap
             window_sec = cfg.EPOCH.window_sec
             overlap_sec = cfg.EPOCH.overlap_sec
@@ -206,44 +303,31 @@ def process_file_wrapper(file_info: Dict, cfg: Dict) -> Dict:
             overlap_samples = int(overlap_sec * sr)
             step_samples = window_samples - overlap_samples
             
-            events = []
-            for i in range(0, len(data_filtered[0]) - window_samples, step_samples):
-                events.append([i, 0, 1])
-            
-            if not events:
+            # Epoch start samples: 0, step, ... (< n_samples - window)
+            n_epochs = len(range(0, data_filtered.shape[-1] - window_samples, step_samples))
+            if n_epochs == 0:
                 logger.warning(f"[{subject}_{condition}_{trial_no}] No epochs created")
                 return _return_nan_metadata(metadata)
             
-            events = np.array(events)
-            epochs = mne.Epochs(
-                raw, events,
-                event_id={'stim': 1},
-                tmin=0,
-                tmax=(window_samples - 1) / sr,
-                baseline=None,
-                verbose=False
-            )
+            # [n_channels, n_windows, window] view -> [n_epochs, n_channels, window]
+            # (stays float32; only the numba nonlinear kernels upcast to float64)
+            windows = sliding_window_view(data_filtered, window_samples, axis=-1)[:, ::step_samples]
+            epochs_data = np.ascontiguousarray(windows[:, :n_epochs].transpose(1, 0, 2))
             
             # ===== Step 4: Artifact Rejection =====
-            # Drop epochs with peak-to-peak > threshold
+            # Drop epochs with peak-to-peak > threshold on any channel
+            # (one reduction over [n_epochs, n_channels, n_times]); a NaN
+            # peak-to-peak is not "> threshold", so such epochs are kept as before
             threshold_uv = cfg.PREPROCESSING.artifact_threshold_uv
-            epochs_to_drop = []
-            for epoch_idx in range(len(epochs)):
-                epoch_data = epochs[epoch_idx][0]
-                p2p_ch1 = np.ptp(epoch_data[0])
-                p2p_ch2 = np.ptp(epoch_data[1])
-                if p2p_ch1 > threshold_uv or p2p_ch2 > threshold_uv:
-                    epochs_to_drop.append(epoch_idx)
-            
-            if epochs_to_drop:
-                epochs.drop(epochs_to_drop)
+            p2p = epochs_data.max(axis=-1) - epochs_data.min(axis=-1)
+            epochs_data = epochs_data[~(p2p > threshold_uv).any(axis=1)]
             
-            if len(epochs) < 3:
+            if len(epochs_data) < 3:
                 logger.warning(f"[{subject}_{condition}_{trial_no}] Too few clean epochs (<3)")
                 return _return_nan_metadata(metadata)
             
             # ===== Step 5: Feature Extraction =====
-            kpi_row = extract_features(epochs, subject, condition, trial_no)
+            kpi_row = extract_features_from_array(epochs_data, sr, subject, condition, trial_no)
             
             return kpi_row
         
@@ -259,75 +343,59 @@ def process_file_wrapper(file_info: Dict, cfg: Dict) -> Dict:
 
 def _return_nan_metadata(metadata: Dict) -> Dict:
     """Return metadata with NaN placeholders for KPIs."""
-    # Generate dummy KPI columns (all NaN)
-    kpi_cols = _get_kpi_columns()
-    row = {**metadata}
-    for col in kpi_cols:
-        row[col] = np.nan
-    return row
+    return {**metadata, **_NAN_KPI_ROW}
 
 
 def _get_kpi_columns() -> List[str]:
     """Get list of all KPI column names."""
-    a_cols = [
-        'amp_max', 'amp_min', 'amp_p2p', 'amp_mean', 'amp_rms',
-        'stat_mean', 'stat_std', 'stat_variance', 'stat_median', 'stat_skewness', 'stat_kurtosis',
-        'zcr', 'slope_mean', 'peak_count', 'peak_mean_height',
-        'hjorth_mobility', 'hjorth_complexity'
-    ]
-    b_cols = [
-        'pow_total',
-        'pow_abs_delta', 'pow_abs_theta', 'pow_abs_alpha', 'pow_abs_beta', 'pow_abs_gamma',
-        'pow_rel_delta', 'pow_rel_theta', 'pow_rel_alpha', 'pow_rel_beta', 'pow_rel_gamma',
-        'peak_freq_hz', 'centroid_hz', 'sef90_hz', 'spec_entropy', 'spec_flatness',
-        'aperiodic_exponent', 'aperiodic_offset',
-        'alpha_beta_ratio', 'theta_beta_ratio'
-    ]
-    c_cols = [
-        'sampen', 'spec_ent', 'perm_ent', 'svd_ent',
-        'higuchi_fd', 'petrosian_fd', 'katz_fd',
-        'lzc', 'dfa'
-    ]
-    d_cols = [
-        'coh_delta', 'coh_theta', 'coh_alpha', 'coh_beta', 'coh_gamma',
-        'pearson_corr',
-        'asym_power_delta', 'asym_power_theta', 'asym_power_alpha', 'asym_power_beta', 'asym_power_gamma'
-    ]
-    
-    kpi_cols = []
-    for col in a_cols + b_cols + c_cols:
-        kpi_cols.append(f'Ch1_{col}')
-    for col in a_cols + b_cols + c_cols:
-        kpi_cols.append(f'Ch2_{col}')
-    for col in d_cols:
-        kpi_cols.append(f'Cross_{col}')
-    
-    return kpi_cols
+    return list(KPI_COLUMNS)
+
+
+# Built once at import: output column list and the all-NaN KPI row template
+_METADATA_COLS = ['Subject', 'Condition', 'Trial_No']
+_RESULT_COLS = [*_METADATA_COLS, *KPI_COLUMNS]
+_NAN_KPI_ROW = dict.fromkeys(KPI_COLUMNS, np.nan)
+
+# Rows buffered per CSV write in main()
+_WRITE_BATCH_ROWS = 100
+
+# Output order: Subject, Condition, Trial_No → Cross_* → Ch1_* → Ch2_* (each sorted)
+_ORDERED_COLS = _METADATA_COLS + [
+    col
+    for prefix in ('Cross_', 'Ch1_', 'Ch2_')
+    for col in sorted(c for c in KPI_COLUMNS if c.startswith(prefix))
+]
 
 
 # ===== Column Ordering =====
 def order_columns(df: pd.DataFrame) -> pd.DataFrame:
     """
     Order columns: Subject, Condition, Trial_No → Cross_* → Ch1_* → Ch2_*.
-    """
-    metadata_cols = ['Subject', 'Condition', 'Trial_No']
-    cross_cols = sorted([c for c in df.columns if c.startswith('Cross_')])
-    ch1_cols = sorted([c for c in df.columns if c.startswith('Ch1_')])
-    ch2_cols = sorted([c for c in df.columns if c.startswith('Ch2_')])
     
-    ordered_cols = metadata_cols + cross_cols + ch1_cols + ch2_cols
-    return df[ordered_cols]
+    The order is fixed at import (_ORDERED_COLS), so every run writes the
+    same column positions; missing columns come back as NaN.
+    """
+    return df.reindex(columns=_ORDERED_COLS)
 
 
 # ===== Main =====
 def main():
     """Main entry point."""
+    log_listener = _start_log_listener()
+    try:
+        _run()
+    finally:
+        _stop_log_listener(log_listener)
+
+
+def _run():
+    """Run the pipeline: config → scan → parallel KPI extraction → CSV + summary."""
     logger.info("=" * 80)
     logger.info("EEG KPI Analysis Pipeline - START")
     logger.info("=" * 80)
     
-    # Load config
-    cfg = load_config()
+    # Load config (EEG_NO_CONFIG_CACHE=1 skips the parsed-config cache)
+    cfg = load_config(use_cache=not os.environ.get("EEG_NO_CONFIG_CACHE"))
     
     # Create output directory
     output_dir = cfg.PATHS.output_dir
@@ -344,21 +412,43 @@ def main():
     # ===== Parallel Processing =====
     logger.info(f"Processing {len(file_list)} files with all CPU cores...")
     
-    results = Parallel(n_jobs=-1)(
-        delayed(process_file_wrapper)(file_info, cfg)
-        for file_info in tqdm(file_list, desc="Processing files")
-    )
+    n_cores = os.cpu_count() or 1
+    n_workers = min(n_cores, len(file_list))
+    chunksize = max(1, len(file_list) // (4 * n_workers))
     
-    # ===== Create DataFrame =====
-    df_results = pd.DataFrame(results)
-    logger.info(f"Processed {len(df_results)} files. Total columns: {len(df_results.columns)}")
+    # ===== Stream Results to CSV =====
+    # Rows are written in small ordered batches as files finish, so memory
+    # stays bounded by _WRITE_BATCH_ROWS instead of growing with the dataset.
+    output_csv = os.path.join(output_dir, "eeg_kpi_analysis_results.csv")
+    n_processed = 0
+    df_head = None
+    batch = []
     
-    # ===== Order Columns =====
-    df_results = order_columns(df_results)
+    # cfg is sent once per worker (initargs); each task only pickles file_info.
+    # imap keeps file order and streams results back as chunks finish.
+    with mp.Pool(
+        processes=n_workers,
+        initializer=_worker_init,
+        initargs=(OmegaConf.to_container(cfg), max(1, n_cores // n_workers)),
+    ) as pool, open(output_csv, 'w', encoding='utf-8-sig', newline='') as f_out:
+        for row in tqdm(
+            pool.imap(_worker_process_file, file_list, chunksize=chunksize),
+            total=len(file_list),
+            desc="Processing files",
+        ):
+            batch.append(row)
+            if len(batch) < _WRITE_BATCH_ROWS and n_processed + len(batch) < len(file_list):
+                continue
+            
+            # Explicit columns skip pandas' per-row key discovery
+            df_batch = order_columns(pd.DataFrame(batch, columns=_RESULT_COLS))
+            df_batch.to_csv(f_out, header=(n_processed == 0), index=False)
+            if df_head is None:
+                df_head = df_batch.head()
+            n_processed += len(batch)
+            batch = []
     
-    # ===== Save CSV =====
-    output_csv = os.path.join(output_dir, "eeg_kpi_analysis_results.csv")
-    df_results.to_csv(output_csv, index=False, encoding='utf-8-sig')
+    logger.info(f"Processed {n_processed} files. Total columns: {len(_ORDERED_COLS)}")
     logger.info(f"✓ CSV saved: {output_csv}")
     
     # ===== Generate Summary Report =====
@@ -368,8 +458,8 @@ def main():
         f.write("EEG KPI Analysis Summary\n")
         f.write("=" * 80 + "\n\n")
         f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-        f.write(f"Total files processed: {len(df_results)}\n")
-        f.write(f"Total KPI columns: {len(df_results.columns) - 3}\n")  # Subtract metadata
+        f.write(f"Total files processed: {n_processed}\n")
+        f.write(f"Total KPI columns: {len(_ORDERED_COLS) - 3}\n")  # Subtract metadata
         f.write(f"\nColumns per channel:\n")
         f.write(f"  - Time-Domain (A): 17\n")
         f.write(f"  - Frequency-Domain (B): 20\n")
@@ -379,7 +469,7 @@ def main():
         f.write(f"  - Cross-Channel (D): 11\n")
         f.write(f"  - Grand Total: 103\n")
         f.write(f"\nFirst few rows:\n")
-        f.write(df_results.head().to_string())
+        f.write(df_head.to_string())
     logger.info(f"✓ Summary saved: {summary_file}")
     
     logger.info("=" * 80)
@@ -0,0 +1,136 @@
+"""
+_fixtures.py
+============
+테스트 공용 준비 단계: 원본 파일 → Clean Epochs (디스크 캐시).
+
+동작:
+1. loader.py로 MNE Raw 객체 로드
+2. preprocessor.py로 전처리 적용
+3. epocher.py로 Epochs 생성
+4. cleaner.py로 Artifact Rejection 수행
+
+결과는 joblib.Memory로 .cache/tests/ 아래에 저장되며, 캐시 키는
+(파일 경로, 파일 mtime/크기, 설정 내용, core 모듈 소스 해시)입니다.
+원본 파일, 설정, 또는 위 4개 core 모듈 중 하나라도 바뀌면 다시 계산합니다.
+
+map_files: 여러 파일에 대한 테스트 단계를 프로세스 풀로 병렬 실행합니다.
+"""
+
+import hashlib
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import repeat
+from pathlib import Path
+
+from joblib import Memory
+from omegaconf import OmegaConf
+
+# 프로젝트 루트를 sys.path에 추가
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+
+memory = Memory(str(project_root / ".cache" / "tests"), verbose=0)
+
+# 캐시된 결과를 만드는 core 모듈 (소스가 바뀌면 캐시 무효화)
+_CORE_SOURCES = ("loader.py", "preprocessor.py", "epocher.py", "cleaner.py")
+
+
+@lru_cache(maxsize=1)
+def _core_digest():
+    """core 준비 단계 모듈 소스의 SHA-256 (프로세스당 한 번 계산)."""
+    h = hashlib.sha256()
+    for name in _CORE_SOURCES:
+        h.update((project_root / "core" / name).read_bytes())
+    return h.hexdigest()
+
+
+@memory.cache
+def _build_clean_epochs(file_path, file_stamp, cfg_dict, core_digest):
+    """캐시되지 않은 준비 단계 (file_stamp, core_digest는 캐시 키로만 사용)."""
+    # MNE를 끌어오는 core 모듈은 호출 시점에 import (모듈 import 비용 회피)
+    from core.cleaner import clean_epochs
+    from core.epocher import create_epochs
+    from core.loader import load_raw_data
+    from core.preprocessor import preprocess_raw
+
+    cfg = OmegaConf.create(cfg_dict)
+    raw = load_raw_data(file_path, cfg)
+    if raw is None:
+        return None
+    raw_filtered = preprocess_raw(raw, cfg)
+    if raw_filtered is None:
+        return None
+    epochs = create_epochs(raw_filtered, cfg)
+    if epochs is None:
+        return None
+    return clean_epochs(epochs, cfg)
+
+
+def get_clean_epochs(file_path, cfg):
+    """
+    원본 파일의 Clean Epochs를 반환 (캐시 적중 시 필터링/Epoching 생략).
+
+    Parameters
+    ----------
+    file_path : str or Path
+        원본 데이터 파일 경로.
+    cfg : DictConfig
+        분석 설정.
+
+    Returns
+    -------
+    mne.Epochs or None
+        Artifact Rejection까지 마친 Epochs. 중간 단계가 실패하면 None.
+    """
+    file_path = str(file_path)
+    st = os.stat(file_path)
+    cfg_dict = OmegaConf.to_container(cfg, resolve=True)
+    return _build_clean_epochs(file_path, (st.st_mtime_ns, st.st_size), cfg_dict, _core_digest())
+
+
+def _sweep_worker_init(n_threads):
+    """풀 초기화: 워커별 numba 스레드 수 제한 (워커 전체가 CPU를 초과 점유하지 않도록)."""
+    import numba
+
+    numba.set_num_threads(max(1, min(n_threads, numba.config.NUMBA_NUM_THREADS)))
+
+
+def map_files(func, files, cfg, max_workers=None):
+    """
+    파일마다 func(file_info, cfg_dict)를 실행 (파일이 2개 이상이면 프로세스 병렬).
+
+    Parameters
+    ----------
+    func : callable
+        모듈 최상위 함수 (워커로 pickle 가능해야 함). 설정은 dict로 전달되므로
+        func 안에서 OmegaConf.create(cfg_dict)로 복원합니다.
+    files : list of dict
+        scan_raw_data가 반환한 파일 정보 목록.
+    cfg : DictConfig
+        분석 설정.
+    max_workers : int, optional
+        최대 워커 수 (기본값: CPU 코어 수의 절반).
+
+    Returns
+    -------
+    list
+        files 순서대로 func의 반환값.
+    """
+    cfg_dict = OmegaConf.to_container(cfg, resolve=True)
+    n_cores = os.cpu_count() or 1
+    if max_workers is None:
+        max_workers = max(1, n_cores // 2)
+    n_workers = min(max_workers, len(files))
+    if n_workers <= 1:
+        return [func(file_info, cfg_dict) for file_info in files]
+
+    with ProcessPoolExecutor(
+        max_workers=n_workers,
+        initializer=_sweep_worker_init,
+        initargs=(max(1, n_cores // n_workers),),
+    ) as executor:
+        return list(executor.map(func, files, repeat(cfg_dict)))
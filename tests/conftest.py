@@ -0,0 +1,12 @@
+"""
+pytest 공통 설정: 프로젝트 루트를 sys.path에 한 번만 추가합니다.
+
+각 테스트 파일의 sys.path 추가는 `python tests/test_xxx.py`로 직접 실행할 때를 위해 유지합니다.
+"""
+
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
@@ -19,8 +19,14 @@ import logging
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-from features.features_A import compute_time_features
-from features.features_B import compute_freq_features
+from features.features_A import _TIME_KPI_KEYS, compute_time_features
+from features.features_B import FOOOF_AVAILABLE, _FREQ_KPI_KEYS, compute_freq_features
+
+# FOOOF 미설치 시 NaN이 허용되는 KPI
+_FOOOF_KPI_KEYS = {'aperiodic_exponent', 'aperiodic_offset'}
+
+# 테스트 신호용 난수 생성기 (PCG64, 재현 가능하도록 시드 고정)
+_rng = np.random.default_rng(seed=0)
 
 
 def generate_test_signal(sr=250, duration=4.0):
@@ -29,7 +35,8 @@ def generate_test_signal(sr=250, duration=4.0):
     
     - Alpha (10Hz) + Beta (20Hz) + Noise
     """
-    t = np.arange(0, duration, 1/sr)
+    n = int(duration * sr)
+    t = np.linspace(0, duration, n, endpoint=False)
     
     # Alpha wave (10Hz, amplitude=5µV)
     alpha = 5 * np.sin(2 * np.pi * 10 * t)
@@ -38,13 +45,13 @@ def generate_test_signal(sr=250, duration=4.0):
     beta = 3 * np.sin(2 * np.pi * 20 * t)
     
     # White noise
-    noise = np.random.normal(0, 1, len(t))
+    noise = _rng.normal(0, 1, n)
     
     signal = alpha + beta + noise
     return signal
 
 
-def main():
+def test_features_ab():
     """테스트 메인 함수."""
     logging.basicConfig(
         level=logging.INFO,
@@ -70,12 +77,15 @@ def main():
     # NaN 체크
     nan_count = sum(1 for v in time_features.values() if np.isnan(v))
     logger.info(f"  ✓ NaN 개수: {nan_count}/{len(time_features)}")
+    assert list(time_features) == list(_TIME_KPI_KEYS), "Time-Domain KPI 키 불일치"
+    assert nan_count == 0, "Time-Domain KPI에 NaN 존재"
     
-    # 샘플 값 출력
-    logger.info("\n  샘플 Time-Domain KPI:")
-    for key in ['amp_mean', 'stat_std', 'zcr', 'hjorth_mobility']:
-        if key in time_features:
-            logger.info(f"    - {key}: {time_features[key]:.6f}")
+    # 샘플 값 출력 (DEBUG 레벨에서만 포맷팅)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("\n  샘플 Time-Domain KPI:")
+        for key in ['amp_mean', 'stat_std', 'zcr', 'hjorth_mobility']:
+            if key in time_features:
+                logger.debug("    - %s: %.6f", key, time_features[key])
 
     # ===== Frequency-Domain 테스트 =====
     logger.info("\n[STEP 2] Frequency-Domain Features 추출 중...")
@@ -86,12 +96,17 @@ def main():
     # NaN 체크
     nan_count = sum(1 for v in freq_features.values() if np.isnan(v))
     logger.info(f"  ✓ NaN 개수: {nan_count}/{len(freq_features)}")
+    assert list(freq_features) == list(_FREQ_KPI_KEYS), "Frequency-Domain KPI 키 불일치"
+    nan_keys = {k for k, v in freq_features.items() if np.isnan(v)}
+    allowed_nan = set() if FOOOF_AVAILABLE else _FOOOF_KPI_KEYS
+    assert nan_keys <= allowed_nan, f"Frequency-Domain KPI에 예상치 못한 NaN: {sorted(nan_keys - allowed_nan)}"
     
-    # 샘플 값 출력
-    logger.info("\n  샘플 Frequency-Domain KPI:")
-    for key in ['pow_total', 'pow_abs_alpha', 'pow_rel_alpha', 'peak_freq_hz', 'aperiodic_exponent']:
-        if key in freq_features:
-            logger.info(f"    - {key}: {freq_features[key]:.6f}")
+    # 샘플 값 출력 (DEBUG 레벨에서만 포맷팅)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("\n  샘플 Frequency-Domain KPI:")
+        for key in ['pow_total', 'pow_abs_alpha', 'pow_rel_alpha', 'peak_freq_hz', 'aperiodic_exponent']:
+            if key in freq_features:
+                logger.debug("    - %s: %.6f", key, freq_features[key])
 
     # ===== 종합 결과 =====
     total_features = len(time_features) + len(freq_features)
@@ -104,4 +119,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    test_features_ab()
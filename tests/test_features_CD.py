@@ -21,8 +21,11 @@ import logging
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-from features.features_C import compute_nonlinear_features
-from features.features_D import compute_cross_features
+from features.features_C import _NONLINEAR_KPI_KEYS, compute_nonlinear_features
+from features.features_D import _CROSS_KPI_KEYS, compute_cross_features
+
+# 테스트 신호용 난수 생성기 (PCG64, 재현 가능하도록 시드 고정)
+_rng = np.random.default_rng(seed=0)
 
 
 def generate_test_signals(sr=250, duration=4.0, scenario='correlated'):
@@ -43,21 +46,22 @@ def generate_test_signals(sr=250, duration=4.0, scenario='correlated'):
     -------
     data_ch1, data_ch2 : np.ndarray
     """
-    t = np.arange(0, duration, 1/sr)
+    n = int(duration * sr)
+    t = np.linspace(0, duration, n, endpoint=False)
     
     if scenario == 'independent':
         # 채널 1: Alpha (10Hz)
-        ch1 = 5 * np.sin(2 * np.pi * 10 * t) + np.random.normal(0, 1, len(t))
+        ch1 = 5 * np.sin(2 * np.pi * 10 * t) + _rng.normal(0, 1, n)
         
         # 채널 2: Beta (20Hz)
-        ch2 = 3 * np.sin(2 * np.pi * 20 * t) + np.random.normal(0, 1, len(t))
+        ch2 = 3 * np.sin(2 * np.pi * 20 * t) + _rng.normal(0, 1, n)
         
     elif scenario == 'correlated':
         # 채널 1: Alpha + Beta + Noise
-        ch1 = 5 * np.sin(2 * np.pi * 10 * t) + 3 * np.sin(2 * np.pi * 20 * t) + np.random.normal(0, 0.5, len(t))
+        ch1 = 5 * np.sin(2 * np.pi * 10 * t) + 3 * np.sin(2 * np.pi * 20 * t) + _rng.normal(0, 0.5, n)
         
         # 채널 2: Ch1의 스케일 변형 + 약간의 추가 노이즈
-        ch2 = 1.1 * ch1 + np.random.normal(0, 0.3, len(t))
+        ch2 = 1.1 * ch1 + _rng.normal(0, 0.3, n)
     
     else:
         raise ValueError(f"Unknown scenario: {scenario}")
@@ -65,7 +69,7 @@ def generate_test_signals(sr=250, duration=4.0, scenario='correlated'):
     return ch1, ch2
 
 
-def main():
+def test_features_cd():
     """테스트 메인 함수."""
     logging.basicConfig(
         level=logging.INFO,
@@ -91,6 +95,7 @@ def main():
     nl_ch1_indep = compute_nonlinear_features(ch1_indep, sr)
     nan_count_c1 = sum(1 for v in nl_ch1_indep.values() if np.isnan(v))
     logger.info(f"    ✓ 추출된 Nonlinear KPI: {len(nl_ch1_indep)}개 (NaN: {nan_count_c1}개)")
+    assert list(nl_ch1_indep) == list(_NONLINEAR_KPI_KEYS) and nan_count_c1 == 0, "Ch1 Nonlinear KPI 오류"
     logger.info(f"    샘플: sampen={nl_ch1_indep['sampen']:.6f}, higuchi_fd={nl_ch1_indep['higuchi_fd']:.6f}, lzc={nl_ch1_indep['lzc']:.6f}")
 
     # Nonlinear Features for Ch2
@@ -98,12 +103,14 @@ def main():
     nl_ch2_indep = compute_nonlinear_features(ch2_indep, sr)
     nan_count_c2 = sum(1 for v in nl_ch2_indep.values() if np.isnan(v))
     logger.info(f"    ✓ 추출된 Nonlinear KPI: {len(nl_ch2_indep)}개 (NaN: {nan_count_c2}개)")
+    assert list(nl_ch2_indep) == list(_NONLINEAR_KPI_KEYS) and nan_count_c2 == 0, "Ch2 Nonlinear KPI 오류"
 
     # Cross-Channel Features
     logger.info("\n  [Step 3] Cross-Channel Features 추출 중...")
     cross_indep = compute_cross_features(ch1_indep, ch2_indep, sr)
     nan_count_d = sum(1 for v in cross_indep.values() if np.isnan(v))
     logger.info(f"    ✓ 추출된 Cross-Channel KPI: {len(cross_indep)}개 (NaN: {nan_count_d}개)")
+    assert list(cross_indep) == list(_CROSS_KPI_KEYS) and nan_count_d == 0, "Cross-Channel KPI 오류"
     logger.info(f"    샘플: pearson_corr={cross_indep['pearson_corr']:.6f}, coh_alpha={cross_indep['coh_alpha']:.6f}")
 
     # ===== 시나리오 2: Correlated Channels =====
@@ -118,26 +125,27 @@ def main():
     nl_ch1_corr = compute_nonlinear_features(ch1_corr, sr)
     nan_count_c1 = sum(1 for v in nl_ch1_corr.values() if np.isnan(v))
     logger.info(f"    ✓ 추출된 Nonlinear KPI: {len(nl_ch1_corr)}개 (NaN: {nan_count_c1}개)")
+    assert list(nl_ch1_corr) == list(_NONLINEAR_KPI_KEYS) and nan_count_c1 == 0, "Ch1 Nonlinear KPI 오류"
 
     # Nonlinear Features for Ch2
     logger.info("\n  [Step 2] Channel 2 - Nonlinear Features 추출 중...")
     nl_ch2_corr = compute_nonlinear_features(ch2_corr, sr)
     nan_count_c2 = sum(1 for v in nl_ch2_corr.values() if np.isnan(v))
     logger.info(f"    ✓ 추출된 Nonlinear KPI: {len(nl_ch2_corr)}개 (NaN: {nan_count_c2}개)")
+    assert list(nl_ch2_corr) == list(_NONLINEAR_KPI_KEYS) and nan_count_c2 == 0, "Ch2 Nonlinear KPI 오류"
 
     # Cross-Channel Features
     logger.info("\n  [Step 3] Cross-Channel Features 추출 중...")
     cross_corr = compute_cross_features(ch1_corr, ch2_corr, sr)
     nan_count_d = sum(1 for v in cross_corr.values() if np.isnan(v))
     logger.info(f"    ✓ 추출된 Cross-Channel KPI: {len(cross_corr)}개 (NaN: {nan_count_d}개)")
+    assert list(cross_corr) == list(_CROSS_KPI_KEYS) and nan_count_d == 0, "Cross-Channel KPI 오류"
     
     # 상관관계 높은 채널에서는 pearson_corr가 높아야 함
     corr_value = cross_corr['pearson_corr']
     logger.info(f"    샘플: pearson_corr={corr_value:.6f} (기대값 >0.8)")
-    if corr_value > 0.8:
-        logger.info(f"    ✓ 예상대로 높은 상관관계!")
-    else:
-        logger.info(f"    ⚠️  상관관계가 예상보다 낮음")
+    assert corr_value > 0.8, f"상관관계가 예상보다 낮음: {corr_value:.6f}"
+    logger.info(f"    ✓ 예상대로 높은 상관관계!")
 
     # ===== 종합 결과 =====
     logger.info("\n" + "=" * 80)
@@ -149,4 +157,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    test_features_cd()
@@ -10,7 +10,9 @@ test_integration_full.py
 4. 컬럼 개수 및 구조 검증
 """
 
+import os
 import sys
+import time
 from pathlib import Path
 import numpy as np
 import mne
@@ -21,11 +23,18 @@ project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 from core_pipeline.feature_extractor import extract_features, _get_all_kpi_columns
+from features.features_B import FOOOF_AVAILABLE
+
+# FOOOF 미설치 시 NaN이 허용되는 KPI (채널별 aperiodic 파라미터)
+_FOOOF_KPI_COLS = {f'{ch}_{key}' for ch in ('Ch1', 'Ch2') for key in ('aperiodic_exponent', 'aperiodic_offset')}
 
 
 logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
 logger = logging.getLogger(__name__)
 
+# 테스트 신호용 난수 생성기 (PCG64, 재현 가능하도록 시드 고정)
+_rng = np.random.default_rng(seed=0)
+
 
 def create_dummy_epochs(sr: int = 250, n_epochs: int = 5, duration_sec: float = 4.0) -> mne.Epochs:
     """
@@ -47,15 +56,15 @@ def create_dummy_epochs(sr: int = 250, n_epochs: int = 5, duration_sec: float =
     n_samples = int(sr * duration_sec)
     
     # 2채널, 다중 에포크 데이터 생성
-    data = np.random.randn(n_epochs, 2, n_samples) * 10  # 10µV scale
+    data = _rng.standard_normal((n_epochs, 2, n_samples)) * 10  # 10µV scale
     
     # Alpha (10Hz) + Beta (20Hz) 신호 추가 (좀 더 현실적)
+    # (모든 에포크에 같은 파형이므로 한 번만 계산해 에포크 축으로 브로드캐스트)
     t = np.linspace(0, duration_sec, n_samples)
-    for i in range(n_epochs):
-        alpha = 5 * np.sin(2 * np.pi * 10 * t)
-        beta = 3 * np.sin(2 * np.pi * 20 * t)
-        data[i, 0, :] += alpha + beta
-        data[i, 1, :] += alpha * 0.8 + beta * 1.2  # 약간 다른 혼합
+    alpha = 5 * np.sin(2 * np.pi * 10 * t)
+    beta = 3 * np.sin(2 * np.pi * 20 * t)
+    data[:, 0, :] += alpha + beta
+    data[:, 1, :] += alpha * 0.8 + beta * 1.2  # 약간 다른 혼합
     
     # MNE Info 생성
     info = mne.create_info(
@@ -64,25 +73,14 @@ def create_dummy_epochs(sr: int = 250, n_epochs: int = 5, duration_sec: float =
         ch_types='eeg'
     )
     
-    # Raw 데이터 생성
-    raw_data = data.reshape(2, -1)  # [2, n_epochs*n_samples]
-    raw = mne.io.RawArray(raw_data, info)
-    
-    # Epochs 생성 (각 에포크의 시작점)
-    events = np.array([[i * n_samples, 0, 1] for i in range(n_epochs)])
-    epochs = mne.Epochs(
-        raw, events,
-        event_id={'stim': 1},
-        tmin=0,
-        tmax=(n_samples - 1) / sr,
-        baseline=None,
-        verbose=False
-    )
+    # Epochs 생성: 배열에서 바로 메모리 상주(preload) EpochsArray 생성
+    # (RawArray → events → Epochs 경유 시 get_data()마다 Raw에서 다시 잘라냄)
+    epochs = mne.EpochsArray(data, info, tmin=0, baseline=None, verbose=False)
     
     return epochs
 
 
-def main():
+def test_integration_full():
     """테스트 메인 함수."""
     logger.info("=" * 80)
     logger.info("Full System Integration Test: 103 KPI Extraction")
@@ -91,30 +89,42 @@ def main():
     # ===== Step 1: Create Dummy Epochs =====
     logger.info("\n[Step 1] Creating dummy EEG Epochs...")
     epochs = create_dummy_epochs(sr=250, n_epochs=5, duration_sec=4.0)
-    logger.info(f"✓ Created epochs: shape {epochs.get_data().shape}")
+    data_arr = epochs.get_data()  # get_data()는 매번 복사본을 만들므로 한 번만 호출
+    logger.info(f"✓ Created epochs: shape {data_arr.shape}")
     logger.info(f"  - n_epochs: {len(epochs)}")
     logger.info(f"  - n_channels: {len(epochs.ch_names)}")
-    logger.info(f"  - n_times per epoch: {epochs.get_data().shape[2]}")
+    logger.info(f"  - n_times per epoch: {data_arr.shape[2]}")
     
     # ===== Step 2: Extract Features =====
     logger.info("\n[Step 2] Extracting 103 KPIs...")
-    try:
-        result_dict = extract_features(
-            epochs,
-            subject="TestSubject",
-            condition=1,
-            trial_no=1
-        )
-        logger.info("✓ Feature extraction completed")
-    except Exception as e:
-        logger.error(f"✗ Feature extraction failed: {e}")
-        return
+    result_dict = extract_features(
+        epochs,
+        subject="TestSubject",
+        condition=1,
+        trial_no=1
+    )
+    logger.info("✓ Feature extraction completed")
     
     # ===== Step 3: Verify KPI Count & Structure =====
     logger.info("\n[Step 3] Verifying KPI structure...")
     
     metadata_cols = ['Subject', 'Condition', 'Trial_No']
-    kpi_cols = [k for k in result_dict.keys() if k not in metadata_cols]
+    
+    # 한 번의 순회로 KPI 열을 채널 접두사별로 분류
+    metadata_set = set(metadata_cols)
+    ch1_kpis, ch2_kpis, cross_kpis, other_kpis = [], [], [], []
+    for k in result_dict:
+        if k in metadata_set:
+            continue
+        if k.startswith('Ch1_'):
+            ch1_kpis.append(k)
+        elif k.startswith('Ch2_'):
+            ch2_kpis.append(k)
+        elif k.startswith('Cross_'):
+            cross_kpis.append(k)
+        else:
+            other_kpis.append(k)
+    kpi_cols = ch1_kpis + ch2_kpis + cross_kpis + other_kpis
     
     logger.info(f"✓ Metadata columns: {len(metadata_cols)}")
     for col in metadata_cols:
@@ -123,10 +133,6 @@ def main():
     logger.info(f"✓ KPI columns: {len(kpi_cols)}")
     
     # 각 채널별 KPI 개수 확인
-    ch1_kpis = [k for k in kpi_cols if k.startswith('Ch1_')]
-    ch2_kpis = [k for k in kpi_cols if k.startswith('Ch2_')]
-    cross_kpis = [k for k in kpi_cols if k.startswith('Cross_')]
-    
     logger.info(f"    - Ch1 KPIs: {len(ch1_kpis)}")
     logger.info(f"    - Ch2 KPIs: {len(ch2_kpis)}")
     logger.info(f"    - Cross-Channel KPIs: {len(cross_kpis)}")
@@ -140,33 +146,34 @@ def main():
     
     actual_total = len(ch1_kpis) + len(ch2_kpis) + len(cross_kpis)
     
-    if len(ch1_kpis) == expected_ch_kpis and len(ch2_kpis) == expected_ch_kpis:
-        logger.info(f"✓ Channel KPI counts correct: {len(ch1_kpis)} + {len(ch2_kpis)} = {len(ch1_kpis) + len(ch2_kpis)}")
-    else:
-        logger.warning(f"✗ Channel KPI count mismatch:")
-        logger.warning(f"  Expected: {expected_ch_kpis} each")
-        logger.warning(f"  Actual: Ch1={len(ch1_kpis)}, Ch2={len(ch2_kpis)}")
+    assert len(ch1_kpis) == expected_ch_kpis and len(ch2_kpis) == expected_ch_kpis, (
+        f"Channel KPI count mismatch: expected {expected_ch_kpis} each, "
+        f"actual Ch1={len(ch1_kpis)}, Ch2={len(ch2_kpis)}"
+    )
+    logger.info(f"✓ Channel KPI counts correct: {len(ch1_kpis)} + {len(ch2_kpis)} = {len(ch1_kpis) + len(ch2_kpis)}")
     
-    if len(cross_kpis) == expected_cross_kpis:
-        logger.info(f"✓ Cross-Channel KPI count correct: {len(cross_kpis)}")
-    else:
-        logger.warning(f"✗ Cross-Channel KPI count mismatch:")
-        logger.warning(f"  Expected: {expected_cross_kpis}")
-        logger.warning(f"  Actual: {len(cross_kpis)}")
+    assert len(cross_kpis) == expected_cross_kpis, (
+        f"Cross-Channel KPI count mismatch: expected {expected_cross_kpis}, actual {len(cross_kpis)}"
+    )
+    logger.info(f"✓ Cross-Channel KPI count correct: {len(cross_kpis)}")
     
-    if actual_total == expected_total:
-        logger.info(f"✓ TOTAL KPI COUNT CORRECT: {actual_total} == {expected_total}")
-    else:
-        logger.warning(f"✗ Total KPI count mismatch:")
-        logger.warning(f"  Expected: {expected_total}")
-        logger.warning(f"  Actual: {actual_total}")
+    assert not other_kpis, f"Unexpected KPI columns: {other_kpis}"
+    assert actual_total == expected_total, (
+        f"Total KPI count mismatch: expected {expected_total}, actual {actual_total}"
+    )
+    logger.info(f"✓ TOTAL KPI COUNT CORRECT: {actual_total} == {expected_total}")
     
     # ===== Step 5: Sample KPI Values =====
-    logger.info("\n[Step 5] Sample KPI values (first 10 KPIs)...")
-    kpi_items = list(result_dict.items())[3:13]  # Skip metadata, get first 10 KPIs
-    for key, val in kpi_items:
-        nan_mark = " (NaN)" if isinstance(val, float) and np.isnan(val) else ""
-        logger.info(f"    - {key}: {val:.6f}{nan_mark}" if isinstance(val, (int, float)) and not np.isnan(val) else f"    - {key}: {val}{nan_mark}")
+    # (DEBUG 레벨에서만 포맷팅)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("\n[Step 5] Sample KPI values (first 10 KPIs)...")
+        kpi_items = list(result_dict.items())[3:13]  # Skip metadata, get first 10 KPIs
+        for key, val in kpi_items:
+            if isinstance(val, (int, float)) and not np.isnan(val):
+                logger.debug("    - %s: %.6f", key, val)
+            else:
+                nan_mark = " (NaN)" if isinstance(val, float) and np.isnan(val) else ""
+                logger.debug("    - %s: %s%s", key, val, nan_mark)
     
     # ===== Step 6: NaN Check =====
     logger.info("\n[Step 6] Checking for NaN values...")
@@ -174,10 +181,35 @@ def main():
     total_count = len(result_dict)
     logger.info(f"✓ NaN count: {nan_count}/{total_count}")
     
+    nan_cols = {k for k, v in result_dict.items() if isinstance(v, float) and np.isnan(v)}
+    allowed_nan = set() if FOOOF_AVAILABLE else _FOOOF_KPI_COLS
+    assert nan_cols <= allowed_nan, f"Unexpected NaN KPIs: {sorted(nan_cols - allowed_nan)}"
     if nan_count == 0:
         logger.info("✓ All KPIs successfully computed (no NaN)")
     else:
-        logger.warning(f"⚠️  {nan_count} KPIs are NaN (possible calculation failures)")
+        logger.info(f"✓ Only FOOOF-dependent KPIs are NaN (FOOOF not installed): {nan_count}")
+    
+    # ===== Step 7: Batch Throughput (성능 회귀 감시) =====
+    # extract_features는 전체 Epoch 배열을 배치 API로 한 번에 처리하므로
+    # Epoch 수가 늘어도 Epoch당 시간이 거의 일정해야 함
+    # (느린 CI에서는 EEG_SKIP_PERF_CHECK=1로 이 단계를 건너뜀)
+    if os.environ.get("EEG_SKIP_PERF_CHECK"):
+        logger.info("\n[Step 7] Skipped (EEG_SKIP_PERF_CHECK set)")
+    else:
+        logger.info("\n[Step 7] Checking batch extraction throughput...")
+        n_bench_epochs = 100
+        max_sec_per_epoch = 0.03  # 여유 있는 상한 (측정값 ~3 ms/Epoch의 10배)
+        bench_epochs = create_dummy_epochs(sr=250, n_epochs=n_bench_epochs, duration_sec=4.0)
+        t_start = time.perf_counter()
+        extract_features(bench_epochs, subject="BenchSubject", condition=1, trial_no=1)
+        elapsed = time.perf_counter() - t_start
+        sec_per_epoch = elapsed / n_bench_epochs
+        logger.info(f"✓ {n_bench_epochs} epochs in {elapsed:.3f}s ({sec_per_epoch * 1e3:.2f} ms/epoch)")
+
+        assert sec_per_epoch < max_sec_per_epoch, (
+            f"Batch extraction slower than {max_sec_per_epoch * 1e3:.0f} ms/epoch "
+            f"({sec_per_epoch * 1e3:.2f} ms/epoch, possible regression)"
+        )
     
     # ===== Final Summary =====
     logger.info("\n" + "=" * 80)
@@ -195,4 +227,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    test_integration_full()
@@ -19,13 +19,15 @@ project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 from core.data_scanner import scan_raw_data
-from core.loader import load_raw_data
-from core.preprocessor import preprocess_raw
 from utils.config_loader import load_and_validate_config
 
 
-def main():
+def test_phase3():
     """Phase 3 테스트 메인 함수."""
+    # MNE/Numba를 끌어오는 core 모듈은 실행 시점에 import (pytest 수집 시 import 비용 회피)
+    from core.loader import load_raw_data
+    from core.preprocessor import preprocess_raw
+
     # 로깅 설정
     logging.basicConfig(
         level=logging.INFO,
@@ -45,9 +47,7 @@ def main():
     # raw_data 폴더에서 유효한 파일 찾기
     valid_files, skipped = scan_raw_data(cfg.PATHS.data_dir)
 
-    if not valid_files:
-        logger.warning("유효한 데이터 파일이 없습니다. 테스트를 종료합니다.")
-        return
+    assert valid_files, "유효한 데이터 파일이 없습니다."
 
     # 첫 번째 파일 선택
     test_file = valid_files[0]
@@ -60,9 +60,7 @@ def main():
     logger.info("\n[STEP 1] 데이터 로드 중...")
     raw = load_raw_data(test_file["path"], cfg)
 
-    if raw is None:
-        logger.error("데이터 로드 실패. 테스트를 종료합니다.")
-        return
+    assert raw is not None, "데이터 로드 실패."
 
     logger.info(f"  ✓ Raw 객체 생성: {raw}")
     logger.info(f"  ✓ 채널 수: {len(raw.ch_names)}, 샘플 수: {len(raw.times)}")
@@ -72,9 +70,7 @@ def main():
     logger.info("\n[STEP 2] 전처리 적용 중...")
     raw_filtered = preprocess_raw(raw, cfg)
 
-    if raw_filtered is None:
-        logger.error("전처리 실패. 테스트를 종료합니다.")
-        return
+    assert raw_filtered is not None, "전처리 실패."
 
     logger.info(f"  ✓ 전처리 완료: {raw_filtered}")
 
@@ -85,4 +81,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    test_phase3()
@@ -10,6 +10,7 @@ Phase 4 검증 스크립트: Epoching & Artifact Rejection 테스트.
 4. epocher.py로 Epochs 생성
 5. cleaner.py로 Artifact Rejection 수행
 6. 결과 확인 (에러 없이 실행되는지 검증)
+7. 나머지 파일은 tests/_fixtures.py 디스크 캐시로 병렬 점검 (재실행 시 필터링/Epoching 생략)
 """
 
 import logging
@@ -20,16 +21,32 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-from core.cleaner import clean_epochs
+from omegaconf import OmegaConf
+
 from core.data_scanner import scan_raw_data
-from core.epocher import create_epochs
-from core.loader import load_raw_data
-from core.preprocessor import preprocess_raw
 from utils.config_loader import load_and_validate_config
 
+from _fixtures import get_clean_epochs, map_files
+
+
+def _check_file(test_file, cfg_dict):
+    """한 파일의 Clean Epochs를 준비하고 (파일명, Epoch 수, Clean Epoch 수)를 반환 (실패 시 None)."""
+    cfg = OmegaConf.create(cfg_dict)
+    clean = get_clean_epochs(test_file["path"], cfg)
+    if clean is None:
+        return test_file["filename"], None, None
+    # drop_log는 Artifact Rejection 전 Epoch마다 한 항목을 가짐
+    return test_file["filename"], len(clean.drop_log), len(clean)
 
-def main():
+
+def test_phase4():
     """Phase 4 테스트 메인 함수."""
+    # MNE/Numba를 끌어오는 core 모듈은 실행 시점에 import (pytest 수집 시 import 비용 회피)
+    from core.cleaner import clean_epochs
+    from core.epocher import create_epochs
+    from core.loader import load_raw_data
+    from core.preprocessor import preprocess_raw
+
     # 로깅 설정
     logging.basicConfig(
         level=logging.INFO,
@@ -49,59 +66,62 @@ def main():
     # raw_data 폴더에서 유효한 파일 찾기
     valid_files, skipped = scan_raw_data(cfg.PATHS.data_dir)
 
-    if not valid_files:
-        logger.warning("유효한 데이터 파일이 없습니다. 테스트를 종료합니다.")
-        return
+    assert valid_files, "유효한 데이터 파일이 없습니다."
 
     # 첫 번째 파일 선택
     test_file = valid_files[0]
-    logger.info(f"\n테스트 파일 선택: {test_file['filename']}")
-    logger.info(f"  - Subject: {test_file['subject']}")
-    logger.info(f"  - Condition: {test_file['condition']}")
-    logger.info(f"  - Trial: {test_file['trial']}")
+    logger.info("\n테스트 파일 선택: %s", test_file['filename'])
+    logger.info("  - Subject: %s", test_file['subject'])
+    logger.info("  - Condition: %s", test_file['condition'])
+    logger.info("  - Trial: %s", test_file['trial'])
 
     # 1. 데이터 로드
     logger.info("\n[STEP 1] 데이터 로드 중...")
     raw = load_raw_data(test_file["path"], cfg)
 
-    if raw is None:
-        logger.error("데이터 로드 실패. 테스트를 종료합니다.")
-        return
+    assert raw is not None, "데이터 로드 실패."
 
-    logger.info(f"  ✓ Raw 객체 생성: {raw}")
+    logger.info("  ✓ Raw 객체 생성: %s", raw)
 
     # 2. 전처리
     logger.info("\n[STEP 2] 전처리 적용 중...")
     raw_filtered = preprocess_raw(raw, cfg)
 
-    if raw_filtered is None:
-        logger.error("전처리 실패. 테스트를 종료합니다.")
-        return
+    assert raw_filtered is not None, "전처리 실패."
 
-    logger.info(f"  ✓ 전처리 완료: {raw_filtered}")
+    logger.info("  ✓ 전처리 완료: %s", raw_filtered)
 
     # 3. Epoching
     logger.info("\n[STEP 3] Epoch 생성 중...")
     epochs = create_epochs(raw_filtered, cfg)
 
-    if epochs is None:
-        logger.error("Epoch 생성 실패. 테스트를 종료합니다.")
-        return
+    assert epochs is not None, "Epoch 생성 실패."
 
-    logger.info(f"  ✓ Epochs 생성: {epochs}")
-    logger.info(f"  ✓ Epoch 수: {len(epochs)}개")
-    logger.info(f"  ✓ Epoch 길이: {cfg.EPOCH.window_sec}초")
+    logger.info("  ✓ Epochs 생성: %s", epochs)
+    logger.info("  ✓ Epoch 수: %s개", len(epochs))
+    logger.info("  ✓ Epoch 길이: %s초", cfg.EPOCH.window_sec)
 
     # 4. Artifact Rejection
     logger.info("\n[STEP 4] Artifact Rejection 수행 중...")
     clean_epochs_obj = clean_epochs(epochs, cfg)
 
-    if clean_epochs_obj is None:
-        logger.error("Artifact Rejection 후 유효한 Epoch이 부족합니다.")
-        return
+    assert clean_epochs_obj is not None, "Artifact Rejection 후 유효한 Epoch이 부족합니다."
+
+    logger.info("  ✓ 정제 완료: %s", clean_epochs_obj)
+    logger.info("  ✓ Clean Epochs 수: %s개", len(clean_epochs_obj))
 
-    logger.info(f"  ✓ 정제 완료: {clean_epochs_obj}")
-    logger.info(f"  ✓ Clean Epochs 수: {len(clean_epochs_obj)}개")
+    # 5. 나머지 파일 (프로세스 풀로 병렬 점검, tests/_fixtures.py 디스크 캐시)
+    other_files = valid_files[1:]
+    if other_files:
+        logger.info("\n[STEP 5] 나머지 %s개 파일 병렬 점검 중...", len(other_files))
+        failed = []
+        for filename, n_epochs, n_clean in map_files(_check_file, other_files, cfg):
+            if n_clean is None:
+                logger.warning("  ✗ %s: 실패", filename)
+                failed.append(filename)
+            else:
+                logger.info("  ✓ %s: Epochs %s개 → Clean %s개", filename, n_epochs, n_clean)
+        assert not failed, f"Phase 4 단계 실패 파일: {failed}"
 
     # 완료
     logger.info("\n" + "=" * 70)
@@ -110,4 +130,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    test_phase4()
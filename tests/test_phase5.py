@@ -5,33 +5,47 @@ Phase 5 검증 스크립트: Feature Extraction 테스트.
 
 동작:
 1. raw_data/ 폴더에서 유효한 파일 하나 선택
-2. loader.py로 MNE Raw 객체 로드
-3. preprocessor.py로 전처리 적용
-4. epocher.py로 Epochs 생성
-5. cleaner.py로 Artifact Rejection 수행
-6. feature_extractor.py로 KPI 추출
-7. 결과 확인 (딕셔너리 키 개수, NaN 처리 등)
+2. 로드 → 전처리 → Epoching → Artifact Rejection
+   (tests/_fixtures.py 디스크 캐시, core 모듈이 그대로면 재실행 시 생략)
+3. feature_extractor.py로 KPI 추출
+4. 결과 확인 (딕셔너리 키 개수, NaN 처리 등)
 """
 
 import logging
 import sys
 from pathlib import Path
 
+import numpy as np
+from omegaconf import OmegaConf
+
 # 프로젝트 루트를 sys.path에 추가
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-from core.cleaner import clean_epochs
 from core.data_scanner import scan_raw_data
-from core.epocher import create_epochs
-from core.feature_extractor import extract_features
-from core.loader import load_raw_data
-from core.preprocessor import preprocess_raw
 from utils.config_loader import load_and_validate_config
 
+from _fixtures import get_clean_epochs, map_files
+
+
+def _extract_file(test_file, cfg_dict):
+    """한 파일의 KPI를 추출하고 (파일명, KPI 수, NaN 수)를 반환 (실패 시 KPI 수 None)."""
+    from core.feature_extractor import extract_features
+
+    cfg = OmegaConf.create(cfg_dict)
+    clean_epochs_obj = get_clean_epochs(test_file["path"], cfg)
+    features = extract_features(clean_epochs_obj, cfg) if clean_epochs_obj is not None else None
+    if features is None:
+        return test_file["filename"], None, None
+    kpi_values = np.fromiter(features.values(), dtype=np.float64, count=len(features))
+    return test_file["filename"], len(features), int(np.isnan(kpi_values).sum())
+
 
-def main():
+def test_phase5():
     """Phase 5 테스트 메인 함수."""
+    # MNE/Numba를 끌어오는 core 모듈은 실행 시점에 import (pytest 수집 시 import 비용 회피)
+    from core.feature_extractor import extract_features
+
     # 로깅 설정
     logging.basicConfig(
         level=logging.INFO,
@@ -51,79 +65,57 @@ def main():
     # raw_data 폴더에서 유효한 파일 찾기
     valid_files, skipped = scan_raw_data(cfg.PATHS.data_dir)
 
-    if not valid_files:
-        logger.warning("유효한 데이터 파일이 없습니다. 테스트를 종료합니다.")
-        return
+    assert valid_files, "유효한 데이터 파일이 없습니다."
 
     # 첫 번째 파일 선택
     test_file = valid_files[0]
-    logger.info(f"\n테스트 파일 선택: {test_file['filename']}")
-    logger.info(f"  - Subject: {test_file['subject']}")
-    logger.info(f"  - Condition: {test_file['condition']}")
-    logger.info(f"  - Trial: {test_file['trial']}")
-
-    # 1. 데이터 로드
-    logger.info("\n[STEP 1] 데이터 로드 중...")
-    raw = load_raw_data(test_file["path"], cfg)
-    if raw is None:
-        logger.error("데이터 로드 실패. 테스트를 종료합니다.")
-        return
-    logger.info(f"  ✓ Raw 객체 생성")
-
-    # 2. 전처리
-    logger.info("\n[STEP 2] 전처리 적용 중...")
-    raw_filtered = preprocess_raw(raw, cfg)
-    if raw_filtered is None:
-        logger.error("전처리 실패. 테스트를 종료합니다.")
-        return
-    logger.info(f"  ✓ 전처리 완료")
-
-    # 3. Epoching
-    logger.info("\n[STEP 3] Epoch 생성 중...")
-    epochs = create_epochs(raw_filtered, cfg)
-    if epochs is None:
-        logger.error("Epoch 생성 실패. 테스트를 종료합니다.")
-        return
-    logger.info(f"  ✓ Epochs 생성: {len(epochs)}개")
-
-    # 4. Artifact Rejection
-    logger.info("\n[STEP 4] Artifact Rejection 수행 중...")
-    clean_epochs_obj = clean_epochs(epochs, cfg)
-    if clean_epochs_obj is None:
-        logger.error("Artifact Rejection 후 유효한 Epoch이 부족합니다.")
-        return
-    logger.info(f"  ✓ Clean Epochs: {len(clean_epochs_obj)}개")
+    logger.info("\n테스트 파일 선택: %s", test_file['filename'])
+    logger.info("  - Subject: %s", test_file['subject'])
+    logger.info("  - Condition: %s", test_file['condition'])
+    logger.info("  - Trial: %s", test_file['trial'])
+
+    # 1~4. 로드 → 전처리 → Epoching → Artifact Rejection (tests/_fixtures.py 디스크 캐시)
+    logger.info("\n[STEP 1-4] Clean Epochs 준비 중 (디스크 캐시 적중 시 생략)...")
+    clean_epochs_obj = get_clean_epochs(test_file["path"], cfg)
+    assert clean_epochs_obj is not None, "Clean Epochs 준비 실패 (로드/전처리/Epoching/Artifact Rejection)."
+    logger.info("  ✓ Clean Epochs: %s개", len(clean_epochs_obj))
 
     # 5. Feature Extraction
     logger.info("\n[STEP 5] Feature Extraction 수행 중...")
     features = extract_features(clean_epochs_obj, cfg)
-    if features is None:
-        logger.error("Feature Extraction 실패. 테스트를 종료합니다.")
-        return
+    assert features is not None, "Feature Extraction 실패."
 
-    logger.info(f"  ✓ Feature Extraction 완료: {len(features)}개 KPI")
+    logger.info("  ✓ Feature Extraction 완료: %s개 KPI", len(features))
 
     # 결과 분석
     logger.info("\n" + "=" * 70)
     logger.info("📊 추출된 KPI 요약:")
     logger.info("=" * 70)
 
-    # KPI 카테고리별 분류
-    band_powers = {k: v for k, v in features.items() if "_Band_" in k}
-    stats = {k: v for k, v in features.items() if "_Stat_" in k}
-    asymmetry = {k: v for k, v in features.items() if "Asym_" in k}
-    coherence = {k: v for k, v in features.items() if "Conn_Coh_" in k}
-    ratios = {k: v for k, v in features.items() if "_Ratio_" in k}
-
-    logger.info(f"  - Band Powers: {len(band_powers)}개")
-    logger.info(f"  - Basic Stats: {len(stats)}개")
-    logger.info(f"  - Asymmetry: {len(asymmetry)}개")
-    logger.info(f"  - Coherence: {len(coherence)}개")
-    logger.info(f"  - Ratios: {len(ratios)}개")
+    # KPI 카테고리별 분류 (키 목록을 한 번만 순회, 카테고리는 서로 배타적이지 않음)
+    n_band = n_stat = n_asym = n_coh = n_ratio = 0
+    for k in features:
+        if "_Band_" in k:
+            n_band += 1
+        if "_Stat_" in k:
+            n_stat += 1
+        if "Asym_" in k:
+            n_asym += 1
+        if "Conn_Coh_" in k:
+            n_coh += 1
+        if "_Ratio_" in k:
+            n_ratio += 1
+
+    logger.info("  - Band Powers: %s개", n_band)
+    logger.info("  - Basic Stats: %s개", n_stat)
+    logger.info("  - Asymmetry: %s개", n_asym)
+    logger.info("  - Coherence: %s개", n_coh)
+    logger.info("  - Ratios: %s개", n_ratio)
 
     # NaN 체크
-    nan_count = sum(1 for v in features.values() if v != v)  # NaN check
-    logger.info(f"  - NaN 값 개수: {nan_count}/{len(features)}")
+    kpi_values = np.fromiter(features.values(), dtype=np.float64, count=len(features))
+    nan_count = int(np.isnan(kpi_values).sum())
+    logger.info("  - NaN 값 개수: %s/%s", nan_count, len(features))
 
     # 샘플 KPI 출력
     logger.info("\n샘플 KPI 값:")
@@ -137,14 +129,27 @@ def main():
     ]
     for key in sample_keys:
         if key in features:
-            logger.info(f"  - {key}: {features[key]:.6f}")
+            logger.info("  - %s: %.6f", key, features[key])
+
+    # 6. 나머지 파일 (프로세스 풀로 병렬 추출)
+    other_files = valid_files[1:]
+    if other_files:
+        logger.info("\n[STEP 6] 나머지 %s개 파일 병렬 추출 중...", len(other_files))
+        failed = []
+        for filename, n_kpis, n_nan in map_files(_extract_file, other_files, cfg):
+            if n_kpis is None:
+                logger.warning("  ✗ %s: Feature Extraction 실패", filename)
+                failed.append(filename)
+            else:
+                logger.info("  ✓ %s: %s개 KPI (NaN %s개)", filename, n_kpis, n_nan)
+        assert not failed, f"Feature Extraction 실패 파일: {failed}"
 
     # 완료
     logger.info("\n" + "=" * 70)
     logger.info("✅ Phase 5 테스트 성공!")
-    logger.info(f"총 {len(features)}개 KPI 추출 완료 (예상: 40~50개)")
+    logger.info("총 %s개 KPI 추출 완료 (예상: 40~50개)", len(features))
     logger.info("=" * 70)
 
 
 if __name__ == "__main__":
-    main()
+    test_phase5()
@@ -0,0 +1,112 @@
+"""
+test_validate_kpi.py
+====================
+validate_kpi.py 검증 스크립트: 물리적 타당성 점검 보고 테스트.
+
+동작:
+1. 임시 폴더에 작은 KPI 테이블(CSV) 작성
+   - 완전 상수 열 1개, float32 해상도보다 작은 차이만 있는 거의 상수 열 1개,
+     매우 작은 음수 파워 값 1개 포함
+2. validate_kpi_table 실행 후 출력 보고 확인
+   (거의 상수 열은 상수로 보고되지 않아야 하고, 작은 음수 파워도 검출되어야 함)
+3. (pyarrow 설치 시) Feather 사본 캐시 확인
+   - 첫 로드에서 <kpi>.feather 작성, 두 번째 로드는 사본에서 같은 표를 읽음
+   - CSV가 더 최신이거나 사본이 손상되면 CSV를 다시 파싱
+"""
+
+import contextlib
+import io
+import logging
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# 프로젝트 루트를 sys.path에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from validate_kpi import _read_kpi_table, validate_kpi_table
+
+
+def test_validate_kpi():
+    """validate_kpi 테스트 메인 함수."""
+    logging.basicConfig(
+        level=logging.INFO,
+        format="[%(levelname)s] %(message)s"
+    )
+    logger = logging.getLogger(__name__)
+
+    n_rows = 6
+    df = pd.DataFrame({
+        'source_file': ['a.csv'] * 3 + ['b.csv'] * 3,
+        'epoch_id': np.arange(n_rows),
+        'label': [0, 1] * 3,
+        'Ch1_B_pow_alpha': [1.0, 2.0, -1e-30, 3.0, 4.0, 5.0],
+        'const_col': np.full(n_rows, 2.5),
+        # 상대 차이 ~1e-9: float32로는 모두 같은 값이 되지만 float64로는 구분됨
+        'near_const_col': 1.0 + 1e-9 * np.arange(n_rows),
+    })
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        kpi_path = str(Path(tmp_dir) / "kpi.csv")
+        df.to_csv(kpi_path, index=False)
+
+        report = io.StringIO()
+        with contextlib.redirect_stdout(report):
+            validate_kpi_table(kpi_path=kpi_path, raw_data_dir=tmp_dir)
+    report = report.getvalue()
+    logger.info(report)
+
+    assert "상수)이 1개" in report, "상수 열 개수가 1개가 아님"
+    assert "'const_col'" in report and "near_const_col" not in report, "거의 상수 열이 상수로 보고됨"
+    assert "음수 값이 1개" in report, "작은 음수 파워 값이 검출되지 않음"
+
+
+def test_read_kpi_table_feather_cache():
+    """Feather 사본 작성/재사용/무효화 테스트."""
+    pytest.importorskip("pyarrow")
+
+    df = pd.DataFrame({
+        'source_file': ['a.csv', 'b.csv'],
+        'epoch_id': [0, 1],
+        'Ch1_B_pow_alpha': [1.5, 2.5],
+    })
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        kpi_path = str(Path(tmp_dir) / "kpi.csv")
+        feather_path = str(Path(tmp_dir) / "kpi.feather")
+        df.to_csv(kpi_path, index=False)
+
+        # 1. 첫 로드: CSV 파싱 후 Feather 사본 작성
+        first = _read_kpi_table(kpi_path)
+        assert os.path.exists(feather_path), "Feather 사본이 작성되지 않음"
+        pd.testing.assert_frame_equal(first, df)
+
+        # 2. 두 번째 로드: 사본에서 같은 표를 읽음
+        feather_mtime = os.stat(feather_path).st_mtime_ns
+        pd.testing.assert_frame_equal(_read_kpi_table(kpi_path), df)
+        assert os.stat(feather_path).st_mtime_ns == feather_mtime, "최신 사본이 있는데 다시 작성됨"
+
+        # 3. CSV가 더 최신이면 다시 파싱하고 사본을 갱신
+        # (mtime 해상도가 거친 파일시스템을 위해 사본 mtime을 1초 과거로 되돌림)
+        df.loc[0, 'Ch1_B_pow_alpha'] = 9.5
+        df.to_csv(kpi_path, index=False)
+        stale_mtime = os.stat(kpi_path).st_mtime_ns - 10**9
+        os.utime(feather_path, ns=(stale_mtime, stale_mtime))
+        pd.testing.assert_frame_equal(_read_kpi_table(kpi_path), df)
+        assert os.stat(feather_path).st_mtime_ns > stale_mtime, "사본이 갱신되지 않음"
+
+        # 4. 손상된 사본은 무시하고 CSV에서 다시 읽음
+        Path(feather_path).write_bytes(b"not a feather file")
+        pd.testing.assert_frame_equal(_read_kpi_table(kpi_path), df)
+        pd.testing.assert_frame_equal(pd.read_feather(feather_path), df)
+
+
+if __name__ == "__main__":
+    test_validate_kpi()
+    test_read_kpi_table_feather_cache()
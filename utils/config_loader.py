@@ -1,30 +1,126 @@
 from __future__ import annotations
 
+import glob
 import os
-from dataclasses import dataclass
-from typing import Optional
+import pickle
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, List, Optional
 
-from omegaconf import DictConfig, OmegaConf
+from omegaconf import MISSING, DictConfig, OmegaConf
 
 
+# Schema for configs/analysis_config.yaml. Merging the YAML onto it type-checks
+# and coerces every value once; unknown keys and wrong types raise on load.
 @dataclass
 class ConfigPaths:
-    data_dir: str
-    output_dir: str
-    log_file: str
+    data_dir: str = MISSING
+    output_dir: str = MISSING
+    log_file: str = MISSING
 
 
+@dataclass
+class FilterBand:
+    low: float = MISSING
+    high: float = MISSING
+
+
+@dataclass
+class PreprocessingConfig:
+    sampling_rate: int = MISSING
+    filter_band: FilterBand = field(default_factory=FilterBand)
+    notch_freq: float = MISSING
+    artifact_threshold_uv: float = MISSING
+
+
+@dataclass
+class EpochConfig:
+    window_sec: float = MISSING
+    overlap_sec: float = MISSING
+
+
+@dataclass
+class KpiSelectConfig:
+    core: List[str] = MISSING
+    optional: List[str] = MISSING
+
+
+@dataclass
+class AnalysisConfig:
+    PATHS: ConfigPaths = field(default_factory=ConfigPaths)
+    PREPROCESSING: PreprocessingConfig = field(default_factory=PreprocessingConfig)
+    EPOCH: EpochConfig = field(default_factory=EpochConfig)
+    BANDS: Dict[str, List[float]] = field(default_factory=dict)
+    KPI_SELECT: KpiSelectConfig = field(default_factory=KpiSelectConfig)
+
+
+# Built once; OmegaConf.merge copies it, so the template itself is never mutated
+_SCHEMA = OmegaConf.structured(AnalysisConfig)
+
+
+def load_yaml_cached(config_path: str, use_cache: bool = True) -> DictConfig:
+    """Load a YAML config, reusing a pickled copy while the file is unchanged.
+
+    The cache sits next to the YAML as ``.<name>.<mtime_ns>.<size>.pkl`` and
+    holds the plain container from ``OmegaConf.to_container(resolve=False)``, so
+    it does not depend on omegaconf's internal classes. Stale caches are removed
+    whenever the YAML is re-parsed. Unreadable or unwritable caches fall back to
+    a plain OmegaConf.load.
+    """
+    if not use_cache:
+        return OmegaConf.load(config_path)
+
+    st = os.stat(config_path)
+    cfg_dir, cfg_name = os.path.split(config_path)
+    cache_prefix = os.path.join(cfg_dir, f".{cfg_name}.")
+    cache_path = f"{cache_prefix}{st.st_mtime_ns}.{st.st_size}.pkl"
+
+    try:
+        with open(cache_path, "rb") as f:
+            return OmegaConf.create(pickle.load(f))
+    except (OSError, EOFError, pickle.UnpicklingError):
+        pass  # missing / truncated / corrupt cache: re-parse below
+
+    cfg = OmegaConf.load(config_path)
+    try:
+        for stale in glob.glob(glob.escape(cache_prefix) + "*.pkl"):
+            os.remove(stale)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            container = OmegaConf.to_container(cfg, resolve=False)
+            pickle.dump(container, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass  # read-only config dir: no cache
+    return cfg
+
 
 def load_config(
     config_path: str = "./configs/analysis_config.yaml",
     cli_args: Optional[list[str]] = None,
 ) -> DictConfig:
-    """Load YAML config, merge CLI overrides, and run fail-fast validation."""
-    cli_args = cli_args or []
-    base_cfg = OmegaConf.load(config_path)
-    cli_cfg = OmegaConf.from_cli(cli_args)
-    cfg = OmegaConf.merge(base_cfg, cli_cfg)
+    """Load YAML config, merge CLI overrides, and run fail-fast validation.
+
+    Results are memoised per (path, file mtime/size, CLI overrides) and returned
+    read-only, so repeated calls in one process skip parse, merge and validation.
+    """
+    st = os.stat(config_path)
+    cfg = _load_config_cached(config_path, st.st_mtime_ns, st.st_size, tuple(cli_args or ()))
+    ensure_config_dirs(cfg)
+    return cfg
+
+
+@lru_cache(maxsize=8)
+def _load_config_cached(
+    config_path: str, mtime_ns: int, size: int, cli_args: tuple[str, ...]
+) -> DictConfig:
+    """Uncached load + merge + validate; mtime_ns/size only key the cache."""
+    base_cfg = load_yaml_cached(config_path)
+    cli_cfg = OmegaConf.from_cli(list(cli_args))
+    cfg = OmegaConf.merge(_SCHEMA, base_cfg, cli_cfg)
     validate_config(cfg)
+    # Shared cached object: callers must not be able to mutate it
+    OmegaConf.set_readonly(cfg, True)
     return cfg
 
 
@@ -36,43 +132,59 @@ def load_and_validate_config(
     return load_config(config_path=config_path, cli_args=cli_args)
 
 
+# Directories already created by ensure_config_dirs in this process
+_CREATED_DIRS: set[str] = set()
+
+
+def ensure_config_dirs(cfg: DictConfig) -> None:
+    """Create the output and log directories named in the config.
+
+    Each directory is created at most once per process; later calls skip the
+    mkdir syscalls.
+    """
+    for d in (cfg.PATHS.output_dir, os.path.dirname(cfg.PATHS.log_file)):
+        if d and d not in _CREATED_DIRS:
+            os.makedirs(d, exist_ok=True)
+            _CREATED_DIRS.add(d)
+
+
 def validate_config(cfg: DictConfig) -> None:
-    """Fail-fast config validation."""
-    # Paths
-    assert cfg.PATHS.data_dir, "PATHS.data_dir is required"
-    assert cfg.PATHS.output_dir, "PATHS.output_dir is required"
-    assert cfg.PATHS.log_file, "PATHS.log_file is required"
+    """Fail-fast config validation.
 
-    os.makedirs(cfg.PATHS.output_dir, exist_ok=True)
-    log_dir = os.path.dirname(cfg.PATHS.log_file)
-    if log_dir:
-        os.makedirs(log_dir, exist_ok=True)
+    Key presence and value types are enforced by the AnalysisConfig schema at
+    merge time; this checks the remaining value ranges. Raises ValueError, so
+    the checks also run under ``python -O``.
+    """
+    missing = OmegaConf.missing_keys(cfg)
+    if missing:
+        raise ValueError(f"Missing required config keys: {sorted(missing)}")
+
+    def check(cond: bool, msg: str) -> None:
+        if not cond:
+            raise ValueError(msg)
+
+    # Paths
+    check(cfg.PATHS.data_dir, "PATHS.data_dir is required")
+    check(cfg.PATHS.output_dir, "PATHS.output_dir is required")
+    check(cfg.PATHS.log_file, "PATHS.log_file is required")
 
     # Preprocessing
     low = cfg.PREPROCESSING.filter_band.low
     high = cfg.PREPROCESSING.filter_band.high
-    assert low < high, "PREPROCESSING.filter_band low must be < high"
-    assert cfg.PREPROCESSING.sampling_rate > 0, "PREPROCESSING.sampling_rate must be > 0"
-    assert cfg.PREPROCESSING.notch_freq > 0, "PREPROCESSING.notch_freq must be > 0"
-    assert cfg.PREPROCESSING.artifact_threshold_uv > 0, "artifact_threshold_uv must be > 0"
+    check(low < high, "PREPROCESSING.filter_band low must be < high")
+    check(cfg.PREPROCESSING.sampling_rate > 0, "PREPROCESSING.sampling_rate must be > 0")
+    check(cfg.PREPROCESSING.notch_freq > 0, "PREPROCESSING.notch_freq must be > 0")
+    check(cfg.PREPROCESSING.artifact_threshold_uv > 0, "artifact_threshold_uv must be > 0")
 
     # Epoch
-    assert cfg.EPOCH.window_sec > 0, "EPOCH.window_sec must be > 0"
-    assert cfg.EPOCH.overlap_sec >= 0, "EPOCH.overlap_sec must be >= 0"
-    assert cfg.EPOCH.overlap_sec < cfg.EPOCH.window_sec, "EPOCH.overlap_sec must be < EPOCH.window_sec"
+    check(cfg.EPOCH.window_sec > 0, "EPOCH.window_sec must be > 0")
+    check(cfg.EPOCH.overlap_sec >= 0, "EPOCH.overlap_sec must be >= 0")
+    check(cfg.EPOCH.overlap_sec < cfg.EPOCH.window_sec, "EPOCH.overlap_sec must be < EPOCH.window_sec")
 
     # Bands
     for name, band in cfg.BANDS.items():
-        assert hasattr(band, '__len__') and len(band) == 2, f"BANDS.{name} must have [low, high]"
+        check(len(band) == 2, f"BANDS.{name} must have [low, high]")
         b_low, b_high = band
-        assert b_low < b_high, f"BANDS.{name}: low must be < high"
-        assert b_low >= 0, f"BANDS.{name}: low must be >= 0"
-        assert b_high <= high, f"BANDS.{name}: high exceeds preprocessing high cutoff"
-
-    # KPI selection
-    assert "core" in cfg.KPI_SELECT, "KPI_SELECT.core missing"
-    assert "optional" in cfg.KPI_SELECT, "KPI_SELECT.optional missing"
-    core_list = OmegaConf.to_container(cfg.KPI_SELECT.core, resolve=True)
-    optional_list = OmegaConf.to_container(cfg.KPI_SELECT.optional, resolve=True)
-    assert isinstance(core_list, list), "KPI_SELECT.core must be a list"
-    assert isinstance(optional_list, list), "KPI_SELECT.optional must be a list"
+        check(b_low < b_high, f"BANDS.{name}: low must be < high")
+        check(b_low >= 0, f"BANDS.{name}: low must be >= 0")
+        check(b_high <= high, f"BANDS.{name}: high exceeds preprocessing high cutoff")
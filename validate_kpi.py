@@ -4,7 +4,75 @@
 import pandas as pd
 import numpy as np
 import os
-import glob
+from concurrent.futures import ThreadPoolExecutor
+
+# pyarrow CSV 엔진 (멀티스레드 파서) + Feather(Arrow IPC) 사본 캐시
+# (없으면 pandas 기본 C 엔진으로 매번 CSV 파싱)
+try:
+    from pyarrow import feather
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# 원본 폴더 탐색 스레드 수 (디렉터리 IO는 지연 시간 위주이므로 CPU 수와 무관)
+_SCAN_WORKERS = 8
+
+def _iter_csv_names(root):
+    """root 아래 .csv 파일명을 재귀적으로 생성 (glob '**/*.csv'와 동일하게 숨김 항목 제외)."""
+    stack = [root]
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for entry in it:
+                if entry.name.startswith('.'):
+                    continue
+                if entry.is_dir():
+                    stack.append(entry.path)
+                elif entry.name.endswith('.csv'):
+                    yield entry.name
+
+def _scan_csv_names(root, max_workers=_SCAN_WORKERS):
+    """root 아래 .csv 파일명 목록. 최상위 하위 폴더마다 스레드로 나누어 탐색."""
+    if not os.path.isdir(root):
+        return []
+    names, subdirs = [], []
+    with os.scandir(root) as it:
+        for entry in it:
+            if entry.name.startswith('.'):
+                continue
+            if entry.is_dir():
+                subdirs.append(entry.path)
+            elif entry.name.endswith('.csv'):
+                names.append(entry.name)
+    if len(subdirs) <= 1:
+        for sub in subdirs:
+            names.extend(_iter_csv_names(sub))
+        return names
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(subdirs))) as pool:
+        for sub_names in pool.map(lambda sub: list(_iter_csv_names(sub)), subdirs):
+            names.extend(sub_names)
+    return names
+
+def _read_kpi_table(kpi_path):
+    """
+    KPI 테이블 로드. CSV보다 최신인 Feather 사본(같은 이름, .feather)이 있으면
+    CSV 파싱 대신 메모리 맵으로 읽고, 없으면 CSV를 읽은 뒤 사본을 저장합니다.
+    """
+    if not PYARROW_AVAILABLE:
+        return pd.read_csv(kpi_path)
+
+    feather_path = os.path.splitext(kpi_path)[0] + '.feather'
+    try:
+        if os.stat(feather_path).st_mtime_ns > os.stat(kpi_path).st_mtime_ns:
+            return feather.read_table(feather_path, memory_map=True).to_pandas()
+    except (OSError, ValueError):
+        pass  # 사본 없음 / 손상: CSV에서 다시 읽음
+
+    df = pd.read_csv(kpi_path, engine='pyarrow')
+    try:
+        df.to_feather(feather_path)
+    except (OSError, ValueError):
+        pass  # 읽기 전용 폴더 등: 사본 없이 진행
+    return df
 
 def validate_kpi_table(
     kpi_path="./results/final_kpi_table.csv", 
@@ -18,7 +86,8 @@ def validate_kpi_table(
         print("❌ [CRITICAL] 결과 파일을 찾을 수 없습니다.")
         return
 
-    df = pd.read_csv(kpi_path)
+    # 모든 열(수치 특징 + source_file)이 아래 점검에 쓰이므로 열 선택 없이 전체를 읽음
+    df = _read_kpi_table(kpi_path)
     n_rows, n_cols = df.shape
     
     # --- 1. 기본 구조 확인 ---
@@ -28,21 +97,24 @@ def validate_kpi_table(
         return
 
     # --- 2. 파일 누락(Data Loss) 확인 ---
-    # 원본 csv 파일 목록 (재귀적 탐색)
-    raw_files = glob.glob(os.path.join(raw_data_dir, "**/*.csv"), recursive=True)
-    # 파일명만 추출 (폴더 경로 제거)
-    raw_filenames = set(os.path.basename(f) for f in raw_files)
+    # 원본 csv 파일명 목록 (os.scandir 재귀 탐색, 폴더 경로 없이 파일명만)
+    # (고정 길이 유니코드 배열로 정렬 + 중복 제거, 이후 차집합은 정렬 병합으로 계산)
+    raw_filenames = np.unique(np.array(_scan_csv_names(raw_data_dir), dtype=str))
     # KPI 테이블에 있는 파일명
-    processed_filenames = set(df['source_file'].unique())
+    processed_filenames = df['source_file'].unique()
     
-    missing_files = raw_filenames - processed_filenames
+    missing_files = np.setdiff1d(
+        raw_filenames,
+        processed_filenames[pd.notna(processed_filenames)].astype(str),
+        assume_unique=True,
+    ).tolist()
     
     print(f"\n📁 [파일 처리 현황]")
     print(f"   - 원본 파일 수: {len(raw_filenames)}개")
     print(f"   - 처리된 파일 수: {len(processed_filenames)}개")
     if len(missing_files) > 0:
         print(f"⚠️ [WARN] {len(missing_files)}개 파일이 결과에서 누락되었습니다.")
-        print(f"   -> 예: {list(missing_files)[:3]} ...")
+        print(f"   -> 예: {missing_files[:3]} ...")
     else:
         print("✅ [PASS] 모든 원본 파일이 처리되었습니다.")
 
@@ -58,7 +130,7 @@ def validate_kpi_table(
 
     # Epoch ID 중복 검사
     if 'source_file' in df.columns and 'epoch_id' in df.columns:
-        duplicates = df.duplicated(subset=['source_file', 'epoch_id']).sum()
+        duplicates = np.count_nonzero(df.duplicated(subset=['source_file', 'epoch_id']).to_numpy())
         if duplicates > 0:
             print(f"❌ [FAIL] 중복된 Epoch ID가 {duplicates}개 발견되었습니다.")
         else:
@@ -66,8 +138,18 @@ def validate_kpi_table(
 
     # --- 4. 결측치(NaN/Inf) 심층 확인 ---
     print(f"\n🕳️ [결측치 점검]")
-    nan_rows = df.isna().any(axis=1).sum()
-    inf_rows = np.isinf(df.select_dtypes(include=np.number)).any(axis=1).sum()
+    # 수치 열은 하나의 float64 ndarray로 한 번만 변환하여 이후 점검에서 재사용
+    # (상수 열/부호/0 점검이 원래 값과 정확히 같도록 float32로 줄이지 않음)
+    num_df = df.select_dtypes(include=np.number)
+    num_arr = num_df.to_numpy(dtype=np.float64, copy=False)
+    nan_cells = np.isnan(num_arr)
+    nan_mask = nan_cells.any(axis=1)
+    other_cols = df.columns.difference(num_df.columns, sort=False)
+    if len(other_cols) > 0:
+        # 비수치 열(source_file 등)의 결측은 pandas로 확인
+        nan_mask |= df[other_cols].isna().to_numpy().any(axis=1)
+    nan_rows = np.count_nonzero(nan_mask)
+    inf_rows = np.count_nonzero(np.isinf(num_arr).any(axis=1))
     
     if nan_rows > 0:
         print(f"⚠️ [WARN] NaN 포함 행: {nan_rows}개 ({nan_rows/n_rows*100:.1f}%) -> 분석 시 삭제됨")
@@ -80,26 +162,33 @@ def validate_kpi_table(
     # --- 5. 물리적 타당성 검증 (Feature Sanity Check) ---
     print(f"\n🧠 [물리적 타당성 검증]")
     
+    # 수치 열 인덱스를 한 번만 계산하여 num_arr에서 바로 슬라이스
+    num_cols = num_df.columns
+    feature_mask = ~num_cols.isin(['label', 'epoch_id'])
+    pow_mask = num_cols.str.contains('_B_pow_', regex=False)
+
     # (1) 파워 스펙트럼은 음수일 수 없음
-    pow_cols = [c for c in df.columns if '_B_pow_' in c]
-    if pow_cols:
-        negative_pow = (df[pow_cols] < 0).sum().sum()
+    if pow_mask.any():
+        negative_pow = int(np.count_nonzero(num_arr[:, pow_mask] < 0))
         if negative_pow > 0:
             print(f"❌ [FAIL] 스펙트럼 파워(Power)에 음수 값이 {negative_pow}개 있습니다. (계산 로직 오류 가능성)")
         else:
             print("✅ [PASS] 스펙트럼 파워 값 정상 (모두 >= 0)")
     
-    # (2) 모든 특징값이 0인 '유령 행' 확인
-    feature_cols = df.select_dtypes(include=[np.number]).columns.drop(['label', 'epoch_id'], errors='ignore')
-    zeros_rows = (df[feature_cols] == 0).all(axis=1).sum()
+    # (2) 모든 특징값이 0인 '유령 행' 확인 (NaN은 0이 아닌 값으로 취급)
+    feat_arr = num_arr[:, feature_mask]
+    zeros_rows = int(np.count_nonzero(~feat_arr.any(axis=1)))
     if zeros_rows > 0:
         print(f"⚠️ [WARN] 모든 특징값이 0인 행이 {zeros_rows}개 있습니다. (신호가 없거나 계산 실패)")
     else:
         print("✅ [PASS] 모든 행에 유효한 특징값이 존재함.")
 
-    # (3) 상수 컬럼 (분산 0) 확인
-    std_vals = df[feature_cols].std()
-    constant_cols = std_vals[std_vals == 0].index.tolist()
+    # (3) 상수 컬럼 (분산 0) 확인: NaN을 제외한 최솟값 == 최댓값 (유한값 2개 이상)
+    col_min = np.fmin.reduce(feat_arr, axis=0)
+    col_max = np.fmax.reduce(feat_arr, axis=0)
+    n_valid = n_rows - np.count_nonzero(nan_cells[:, feature_mask], axis=0)
+    is_constant = (col_min == col_max) & np.isfinite(col_min) & (n_valid >= 2)
+    constant_cols = num_cols[feature_mask][is_constant].tolist()
     if constant_cols:
         print(f"⚠️ [WARN] 값이 전혀 변하지 않는 특징(상수)이 {len(constant_cols)}개 있습니다.")
         print(f"   -> {constant_cols[:3]} ...")